@@ -0,0 +1,224 @@
+# cli.py
+# Non-interactive entry point: the same processing, chart and export
+# operations as the main.py menu, driven by command-line arguments so the
+# analytics can run from cron or a batch worker without a TTY.
+# stdout only carries what --out - and --timing - ask for; every message of
+# the loader, exporters and charts goes to stderr.
+#
+# Example:
+#   python cli.py -i "data/*_trending.csv" --ops count engagement top_ten \
+#       --out exports/results.json --export top10=exports/top10.csv:csv \
+#       --chart pie_categories=exports/pie.png --timing -
+
+import argparse
+import json
+import os
+import sys
+import time
+from contextlib import redirect_stdout
+from modules.aggregation import METRICS
+from modules.data_loader import load_dataset, peak_memory_kb
+from modules import result_cache
+from modules.result_cache import RESULTS
+
+DEFAULT_DATASET = "data/youtube_trending_videos.csv"
+
+# processing operations: every aggregate() metric, plus the row count
+OPERATIONS = ("count",) + tuple(METRICS)
+
+# charts that can be rendered to files (see modules/visualisation.CHARTS)
+CHARTS = (
+    "pie_categories", "hist_engagement", "cat_trend_lines", "compare_top_bars",
+    "dashboard_view", "mark_anomalies", "tag_wordcloud"
+)
+
+
+def build_parser():
+    """Argument parser of the command-line entry point."""
+    parser = argparse.ArgumentParser(
+        description="Run YouTube trending analytics without the interactive menu."
+    )
+    parser.add_argument("-i", "--input", nargs="+", default=[DEFAULT_DATASET],
+                        help="CSV files or glob patterns to load")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(),
+                        help="processes used to parse and aggregate large files")
+    parser.add_argument("--cache", action="store_true",
+                        help="reuse / write binary snapshots next to the CSV files")
+    parser.add_argument("--ops", nargs="+", default=[], choices=OPERATIONS, metavar="OP",
+                        help="processing operations: " + ", ".join(OPERATIONS))
+    parser.add_argument("--out", help="write the operation results here ('-' for stdout)")
+    parser.add_argument("--out-format", default="json", choices=("json", "compact", "columnar"),
+                        help="format of --out")
+    parser.add_argument("--export", nargs="+", default=[], metavar="REPORT=PATH[:FMT]",
+                        help="reports to write, e.g. top10=exports/top10.csv:csv")
+    parser.add_argument("--job", help="JSON file holding a list of export report specs")
+    parser.add_argument("--video-id", help="video used by details/recommendation reports")
+    parser.add_argument("--category", help="category id used by filtered reports")
+    parser.add_argument("--channel", help="channel name used by filtered reports")
+    parser.add_argument("--chart", nargs="+", default=[], metavar="NAME=PATH",
+                        help="charts to render to files (.png/.svg, dashboard_view: .html): "
+                             + ", ".join(CHARTS))
+    parser.add_argument("--chart-pack", metavar="DIR",
+                        help="render every chart into DIR")
+    parser.add_argument("--chart-format", default="png", choices=("png", "svg"),
+                        help="image format of --chart-pack")
+    parser.add_argument("--chart-workers", type=int, default=os.cpu_count(),
+                        help="processes rendering charts in parallel")
+    parser.add_argument("--timing", help="write timing as JSON here ('-' for stdout)")
+    return parser
+
+
+def parse_export(text, args):
+    """Turn REPORT=PATH[:FMT] into an export job spec."""
+    report, sep, target = text.partition("=")
+    if not sep or not target:
+        raise ValueError(f"Expected REPORT=PATH[:FMT], got {text}")
+
+    path, fmt = target, "json"
+    head, sep, tail = target.rpartition(":")
+    if sep and tail in ("json", "compact", "jsonl", "csv"):
+        path, fmt = head, tail
+    if path == "-":
+        raise ValueError(f"Reports are written to files, not stdout: {text}")
+
+    spec = {"report": report, "path": path, "fmt": fmt}
+    for key in ("video_id", "category", "channel"):
+        if getattr(args, key) is not None:
+            spec[key] = getattr(args, key)
+    return spec
+
+
+def _plain(result):
+    """Results as JSON-ready values (VideoEntry lists become dicts)."""
+    if isinstance(result, list):
+        return [e.to_dict() if hasattr(e, "to_dict") else e for e in result]
+    return result
+
+
+def write_results(results, out, out_format, stdout=None):
+    """Write the operation results to a file, or with out "-" to stdout."""
+    from modules.exporter import write_mapping
+    from modules.columnar import export_results_columnar
+
+    if out_format == "columnar":
+        export_results_columnar(results, out)
+    elif out == "-":
+        plain = {name: _plain(value) for name, value in results.items()}
+        stdout = stdout or sys.stdout
+        json.dump(plain, stdout, indent=None if out_format == "compact" else 4)
+        stdout.write("\n")
+    else:
+        write_mapping({name: _plain(value) for name, value in results.items()}, out, out_format)
+
+
+def write_timing(timing, target, stdout):
+    """Write the timing record to a file, or with target "-" to stdout."""
+    if target == "-":
+        # stdout may also carry --out -; timing goes last, on one line
+        stdout.write(json.dumps(timing) + "\n")
+    elif target:
+        with open(target, "w", encoding="utf-8") as jf:
+            json.dump(timing, jf, indent=4)
+
+
+def run_cli(argv=None):
+    """Run one non-interactive pass; returns the process exit code."""
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.out == "-" and args.out_format == "columnar":
+        parser.error("columnar results need a file path for --out")
+
+    stdout = sys.stdout
+    with redirect_stdout(sys.stderr):
+        return _run(parser, args, stdout)
+
+
+def _run(parser, args, stdout):
+    """Body of run_cli; printed messages already go to stderr, results to stdout."""
+    started = time.perf_counter()
+    timing = {"ops": {}, "exports": [], "charts": []}
+
+    # specs and chart names are checked before the (possibly long) load
+    try:
+        specs = [parse_export(text, args) for text in args.export]
+        if args.job:
+            with open(args.job, "r", encoding="utf-8") as jf:
+                job = json.load(jf)
+            if not isinstance(job, list) or not all(isinstance(spec, dict) for spec in job):
+                raise ValueError(f"{args.job} must hold a JSON list of export specs")
+            specs.extend(job)
+        if specs:
+            from modules.export_job import check_specs
+            check_specs(specs)
+            for spec in specs:
+                if spec["path"] == "-":
+                    raise ValueError(f"Report {spec['report']} needs a file path, not stdout")
+        for text in args.chart:
+            name, sep, path = text.partition("=")
+            if name not in CHARTS or not sep or not path:
+                raise ValueError(f"Expected CHART=PATH with a known chart, got {text}")
+    except (OSError, ValueError) as err:
+        parser.error(str(err))
+
+    result_cache.AGGREGATE_WORKERS = args.workers or 1
+    step = time.perf_counter()
+    data_obj = load_dataset(args.input, workers=args.workers, use_cache=args.cache)
+    timing["load"] = round(time.perf_counter() - step, 4)
+
+    if data_obj is None:
+        status = 1
+    else:
+        timing["rows"] = len(data_obj)
+        status = _run_steps(args, data_obj, specs, timing, stdout)
+
+    timing["cache"] = RESULTS.stats()
+    timing["total"] = round(time.perf_counter() - started, 4)
+    timing["peak_memory_kb"] = peak_memory_kb()
+    timing["status"] = status
+    write_timing(timing, args.timing, stdout)
+    return status
+
+
+def _run_steps(args, data_obj, specs, timing, stdout):
+    """Operations, exports and charts on the loaded table; returns the exit status."""
+    status = 0
+
+    if args.ops:
+        from modules.result_cache import cached_aggregate
+
+        results = {}
+        metrics = [op for op in args.ops if op in METRICS]
+        step = time.perf_counter()
+        if metrics:
+            results.update(cached_aggregate(data_obj, metrics))
+        if "count" in args.ops:
+            results["count"] = len(data_obj)
+        timing["ops"] = {"operations": list(args.ops), "seconds": round(time.perf_counter() - step, 4)}
+
+        if args.out:
+            step = time.perf_counter()
+            write_results({op: results[op] for op in args.ops}, args.out, args.out_format, stdout)
+            timing["ops"]["write_seconds"] = round(time.perf_counter() - step, 4)
+
+    if specs:
+        from modules.export_job import run_export_job
+        timing["exports"] = run_export_job(data_obj, specs)
+        if not all(t["ok"] for t in timing["exports"]):
+            status = 3
+
+    if args.chart or args.chart_pack:
+        # plotting libraries are only imported by the chart functions
+        from modules import visualisation
+
+        jobs = [tuple(text.split("=", 1)) for text in args.chart]
+        if args.chart_pack:
+            jobs.extend(visualisation.chart_pack_jobs(args.chart_pack, args.chart_format))
+        timing["charts"] = visualisation.render_charts(data_obj, jobs, args.chart_workers)
+        if not all(t["ok"] for t in timing["charts"]):
+            status = 3
+
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(run_cli())
@@ -0,0 +1,87 @@
+# json_benchmark.py
+# Throughput of the JSON export backends. Writes the full video records of a
+# dataset with every backend usable here (exporter.json_backends()) in the
+# compact and jsonl formats and reports the bytes written per second, so the
+# JSON_BACKEND default can be checked against the installed libraries.
+#
+#   python json_benchmark.py [-i data/youtube_trending_videos.csv] [--runs 3] [--json]
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from contextlib import redirect_stdout
+
+from modules import exporter
+from modules.data_loader import load_dataset
+
+# dataset written by default (the one cli.py loads)
+DEFAULT_DATASET = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                               "data", "youtube_trending_videos.csv")
+
+# formats whose output depends on the backend (indented JSON is always stdlib)
+FORMATS = ("compact", "jsonl")
+
+
+def measure(records, backend, fmt, runs=3):
+    """
+    Write records `runs` times with backend in fmt. Returns the best run as
+    {"seconds", "bytes", "bytes_per_s"}.
+    """
+    best = None
+    with tempfile.TemporaryDirectory() as folder:
+        save_path = os.path.join(folder, f"records.{fmt}")
+        for _ in range(runs):
+            started = time.perf_counter()
+            exporter.write_records(iter(records), save_path, fmt,
+                                   schema=exporter.RECORD_FIELDS, backend=backend)
+            seconds = time.perf_counter() - started
+            if best is None or seconds < best["seconds"]:
+                size = os.path.getsize(save_path)
+                best = {"seconds": seconds, "bytes": size,
+                        "bytes_per_s": size / seconds if seconds else 0.0}
+    return best
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare the JSON export backends.")
+    parser.add_argument("-i", "--input", default=DEFAULT_DATASET)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--json", action="store_true", help="print the result as JSON")
+    args = parser.parse_args(argv)
+
+    # loader messages go to stderr, stdout is kept for the result
+    with redirect_stdout(sys.stderr):
+        data_obj = load_dataset(args.input, workers=1)
+    if not data_obj:
+        print(f"No rows loaded from {args.input}", file=sys.stderr)
+        return 1
+    records = [exporter._entry_to_dict(entry) for entry in data_obj]
+
+    results = []
+    for backend in exporter.json_backends():
+        for fmt in FORMATS:
+            run = measure(records, backend, fmt, args.runs)
+            results.append({"backend": backend, "format": fmt, **run})
+
+    if args.json:
+        print(json.dumps({
+            "input": args.input,
+            "records": len(records),
+            "results": [{"backend": r["backend"], "format": r["format"],
+                         "bytes": r["bytes"], "seconds": round(r["seconds"], 4),
+                         "bytes_per_s": round(r["bytes_per_s"])} for r in results]
+        }))
+    else:
+        print(f"{len(records)} records from {args.input} (best of {args.runs} runs)")
+        for r in results:
+            print(f"  {r['backend']:8} {r['format']:8} {r['bytes_per_s'] / 1e6:8.1f} MB/s "
+                  f"({r['bytes']} bytes in {r['seconds'] * 1000:.1f} ms)")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
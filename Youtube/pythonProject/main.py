@@ -1,5 +1,6 @@
 # main.py
 
+import os
 from modules.data_loader import load_dataset
 from modules.data_processing import (
     count_videos, count_channels, list_categories, fetch_video_info,
@@ -10,23 +11,32 @@ from modules.data_processing import (
 from modules.visualisation import (
     pie_categories, hist_engagement, cat_trend_lines,
     compare_top_bars, dashboard_view, mark_anomalies,
-    tag_wordcloud
+    tag_wordcloud, render_chart_pack
 )
 from modules.exporter import (
     export_video_details, export_top_ten, export_engagement_summary,
     export_filtered_dataset, export_recommendations,
-    export_anomaly_report, export_trend_prediction
+    export_anomaly_report, export_trend_prediction, export_neighbour_table
 )
+from modules.columnar import export_columnar, export_results_columnar
+from modules.aggregation import METRICS
+from modules.export_job import DEFAULT_REPORTS, run_export_job, show_job_timings
+from modules.neighbours import recommend_all
+from modules import result_cache
+from modules.result_cache import RESULTS, cached_aggregate
 from modules.user_comm import (
     show_menu, submenu_basic, submenu_intermediate, submenu_advanced,
-    submenu_visuals, submenu_export, ask_video_id, ask_title_name,
+    submenu_visuals, submenu_export, ask_dataset_path, ask_video_id, ask_title_name,
     ask_export_path, ask_csv_or_json, ask_category_id, ask_channel_name,
     show_msg
 )
 
+DEFAULT_DATASET = "data/youtube_trending_videos.csv"
 
 def main():
     data_obj = None
+    # large tables are aggregated on every core
+    result_cache.AGGREGATE_WORKERS = os.cpu_count() or 1
     show_msg("System started. Select an option from the menu.")
 
     while True:
@@ -36,7 +46,10 @@ def main():
         # LOAD DATASET
         # -------------------------------------------------
         if choice == "1":
-            data_obj = load_dataset("data/youtube_trending_videos.csv")
+            data_path = ask_dataset_path(DEFAULT_DATASET)
+            # results of the previous dataset are never asked for again
+            RESULTS.invalidate()
+            data_obj = load_dataset(data_path, workers=os.cpu_count(), use_cache=True)
             show_msg("Dataset loaded successfully.") if data_obj else show_msg("Dataset load failed.")
 
         # -------------------------------------------------
@@ -59,12 +72,12 @@ def main():
                 elif opt == "4":
                     vid = ask_video_id()
                     entry = fetch_video_info(data_obj, vid_input=vid)
-                    show_msg(str(entry.__dict__)) if entry else show_msg("Video not found.")
+                    show_msg(str(entry.to_dict())) if entry else show_msg("Video not found.")
 
                 elif opt == "5":
                     title = ask_title_name()
                     entry = fetch_video_info(data_obj, title_input=title)
-                    show_msg(str(entry.__dict__)) if entry else show_msg("Video not found.")
+                    show_msg(str(entry.to_dict())) if entry else show_msg("Video not found.")
 
                 elif opt == "6":
                     res = top_ten_items(data_obj)
@@ -162,6 +175,15 @@ def main():
                 elif opt == "7":
                     tag_wordcloud(data_obj)
 
+                elif opt == "8":
+                    out_dir = input("Enter folder for the charts (e.g., exports/charts): ").strip()
+                    fmt = input("Image type (png/svg): ").strip().lower()
+                    timings = render_chart_pack(data_obj, out_dir or "exports/charts",
+                                                "svg" if fmt == "svg" else "png", os.cpu_count())
+                    for t in timings:
+                        status = "ok" if t["ok"] else f"FAILED ({t['error']})"
+                        show_msg(f"{t['chart']:<18} {t['seconds']:>7.3f}s  {t['path']}  {status}")
+
                 elif opt == "0":
                     break
 
@@ -222,6 +244,30 @@ def main():
                     path = ask_export_path()
                     export_trend_prediction(preds, path)
 
+                elif opt == "8":
+                    neighbours = recommend_all(data_obj, workers=os.cpu_count())
+                    path = ask_export_path()
+                    export_neighbour_table(neighbours, data_obj, path)
+
+                elif opt == "9":
+                    path = ask_export_path()
+                    export_columnar(data_obj, path)
+
+                elif opt == "10":
+                    results = cached_aggregate(data_obj, METRICS)
+                    path = ask_export_path()
+                    export_results_columnar(results, path)
+
+                elif opt == "11":
+                    specs = list(DEFAULT_REPORTS)
+                    cat = input("Category ID for the filtered report (blank to skip): ").strip()
+                    if cat:
+                        specs.append({"report": "filtered", "path": "exports/filtered.json", "category": cat})
+                    vid = input("Video ID for the recommendation report (blank to skip): ").strip()
+                    if vid:
+                        specs.append({"report": "recommendation", "path": "exports/recommendation.json", "video_id": vid})
+                    show_job_timings(run_export_job(data_obj, specs))
+
                 elif opt == "0":
                     break
 
@@ -0,0 +1,604 @@
+# modules/aggregation.py
+# Fused aggregation engine: every dataset-wide metric is an aggregator with
+# update(batch) / merge(other) / result(), so any set of metrics can be
+# computed together in a single pass over the data.
+
+import os
+import zlib
+from collections import defaultdict, Counter
+from concurrent.futures import ProcessPoolExecutor
+from itertools import compress, repeat
+from operator import add, and_, floordiv, gt, lt
+from modules.binning import LogHistogram
+from modules.topk import TopK
+from modules.trend_days import TrendDays, parse_trending_date, ordinal_to_text
+from modules.video_table import VideoTable
+from modules.workers import init_worker_table, worker_table
+
+
+def batches_of(data_obj):
+    """
+    Yield VideoTable chunks from either one loaded table or a stream
+    of batches (see data_loader.iter_batches).
+    """
+    if isinstance(data_obj, VideoTable):
+        yield data_obj
+    else:
+        yield from data_obj
+
+
+def _owned_rows(batch, entries):
+    """
+    Copies of entries (rows of batch, in order) backed by one small table
+    holding only those rows, so keeping them does not keep batch alive.
+    """
+    if not entries:
+        return []
+    return list(batch.take([entry.row_index for entry in entries]))
+
+
+# ------------------------------------
+# AGGREGATORS
+# ------------------------------------
+# Aggregators whose state is plain data also provide to_state() and
+# from_state() so it can be saved as JSON (see modules/incremental.py).
+# Aggregators that keep rows provide remap_rows(fn), fn(item) -> (new item,
+# global position), used to move results between shard and full tables, and
+# detach_rows(batch), which copies the rows just kept from a streamed batch
+# into a small owned table so the batch itself can be freed.
+
+class CategoryCounts:
+    """category_id -> number of rows (list_categories)."""
+
+    def __init__(self):
+        self.counts = defaultdict(int)
+
+    def update(self, batch):
+        cats = batch.column("category_id")
+        for cat, count in zip(cats.values, cats.counts()):
+            self.counts[cat] += count
+
+    def merge(self, other):
+        for cat, count in other.counts.items():
+            self.counts[cat] += count
+
+    def result(self):
+        return dict(self.counts)
+
+    def to_state(self):
+        return dict(self.counts)
+
+    @classmethod
+    def from_state(cls, state):
+        agg = cls()
+        agg.counts.update(state)
+        return agg
+
+
+class ChannelCount:
+    """Number of distinct channel titles (count_channels)."""
+
+    def __init__(self):
+        self.channels = set()
+
+    def update(self, batch):
+        self.channels.update(batch.column("channel_title").values)
+
+    def merge(self, other):
+        self.channels |= other.channels
+
+    def result(self):
+        return len(self.channels)
+
+    def to_state(self):
+        return sorted(self.channels)
+
+    @classmethod
+    def from_state(cls, state):
+        agg = cls()
+        agg.channels.update(state)
+        return agg
+
+
+class CategoryEngagement:
+    """Per-category like/dislike/comment sums and row counts (avg_engagement_by_cat)."""
+
+    def __init__(self):
+        # category_id -> [likes, dislikes, comments, count]
+        self.sums = {}
+
+    def update(self, batch):
+        likes = batch.column("likes").__getitem__
+        dislikes = batch.column("dislikes").__getitem__
+        comments = batch.column("comment_count").__getitem__
+
+        # per-category sums over the category index buckets (a bincount)
+        for cat, rows in batch.index("category_id").items():
+            self._add(cat, [
+                sum(map(likes, rows)), sum(map(dislikes, rows)),
+                sum(map(comments, rows)), len(rows)
+            ])
+
+    def _add(self, cat, vals):
+        total = self.sums.setdefault(cat, [0, 0, 0, 0])
+        for i, v in enumerate(vals):
+            total[i] += v
+
+    def merge(self, other):
+        for cat, vals in other.sums.items():
+            self._add(cat, vals)
+
+    def result(self):
+        final = {}
+        for cat, (likes, dislikes, comments, count) in self.sums.items():
+            if count > 0:
+                final[cat] = {
+                    "avg_likes": likes // count,
+                    "avg_dislikes": dislikes // count,
+                    "avg_comments": comments // count
+                }
+        return final
+
+    def to_state(self):
+        return self.sums
+
+    @classmethod
+    def from_state(cls, state):
+        agg = cls()
+        agg.sums = {cat: list(vals) for cat, vals in state.items()}
+        return agg
+
+
+class TrendingDays:
+    """
+    video_id -> distinct trending days (trending_duration).
+    Dates are interned as day ordinals and held in one TrendDays bitset
+    per video; the rare non-empty date that does not parse is kept as text.
+    """
+
+    def __init__(self):
+        self.days = defaultdict(TrendDays)
+        self.unparsed = defaultdict(set)
+
+    def update(self, batch):
+        dates = batch.column("trending_date")
+        # one parse per distinct date string in the batch
+        ordinals = [parse_trending_date(text) for text in dates.values]
+
+        for vid, code in zip(batch.column("video_id"), dates.codes):
+            text = dates.values[code]
+            if not text:
+                continue
+            # created on the first dated row, parsed or not: days keeps
+            # every video in the order of its first row
+            days = self.days[vid]
+            day = ordinals[code]
+            if day is not None:
+                days.add(day)
+            else:
+                self.unparsed[vid].add(text)
+
+    def merge(self, other):
+        for vid, days in other.days.items():
+            self.days[vid].merge(days)
+        for vid, texts in other.unparsed.items():
+            self.unparsed[vid] |= texts
+
+    def result(self):
+        unparsed = self.unparsed
+        return {vid: days.count() + len(unparsed.get(vid, ()))
+                for vid, days in self.days.items()}
+
+    def to_state(self):
+        return {
+            "days": {vid: days.to_state() for vid, days in self.days.items()},
+            "unparsed": {vid: sorted(texts) for vid, texts in self.unparsed.items()}
+        }
+
+    @classmethod
+    def from_state(cls, state):
+        agg = cls()
+        for vid, days in state["days"].items():
+            agg.days[vid] = TrendDays.from_state(days)
+        for vid, texts in state["unparsed"].items():
+            agg.days[vid]  # older states had no days entry for these
+            agg.unparsed[vid] = set(texts)
+        return agg
+
+
+class TrendingProfile(TrendingDays):
+    """
+    video_id -> first/last trending day, day count, longest streak and gaps.
+    Unparsed dates count as days, as in trending_duration, but have no place
+    in the calendar: a video with only unparsed dates has no first/last day.
+    """
+
+    def result(self):
+        found = {}
+        for vid, days in self.days.items():
+            # a video with only unparsed dates has an empty TrendDays
+            first, last = days.first_day(), days.last_day()
+            found[vid] = {
+                "days": days.count() + len(self.unparsed.get(vid, ())),
+                "first_day": None if first is None else ordinal_to_text(first),
+                "last_day": None if last is None else ordinal_to_text(last),
+                "longest_streak": days.longest_streak(),
+                "gaps": days.gaps()
+            }
+        return found
+
+
+class OddLikeRatio:
+    """Rows whose like/dislike ratio is above 20 (odd_like_ratio)."""
+
+    def __init__(self):
+        self.flagged = []
+        # flagged[fresh:] were kept by the last update
+        self.fresh = 0
+
+    def update(self, batch):
+        # if dislikes = 0 the ratio is the like count itself
+        cols = zip(batch.column("likes"), batch.column("dislikes"))
+        mask = [(likes / dislikes if dislikes > 0 else likes) > 20 for likes, dislikes in cols]
+        self.fresh = len(self.flagged)
+        self.flagged.extend(map(batch.__getitem__, compress(range(len(batch)), mask)))
+
+    def merge(self, other):
+        self.flagged.extend(other.flagged)
+
+    def remap_rows(self, fn):
+        self.flagged = [fn(item)[0] for item in self.flagged]
+
+    def detach_rows(self, batch):
+        self.flagged[self.fresh:] = _owned_rows(batch, self.flagged[self.fresh:])
+        self.fresh = len(self.flagged)
+
+    def result(self):
+        return list(self.flagged)
+
+
+class Anomalies:
+    """Rows with high likes but very few comments (catch_anomalies)."""
+
+    def __init__(self):
+        self.flagged = []
+        # flagged[fresh:] were kept by the last update
+        self.fresh = 0
+
+    def update(self, batch):
+        mask = map(and_,
+                   map(gt, batch.column("likes"), repeat(50000)),
+                   map(lt, batch.column("comment_count"), repeat(50)))
+        self.fresh = len(self.flagged)
+        self.flagged.extend(map(batch.__getitem__, compress(range(len(batch)), mask)))
+
+    def merge(self, other):
+        self.flagged.extend(other.flagged)
+
+    def remap_rows(self, fn):
+        self.flagged = [fn(item)[0] for item in self.flagged]
+
+    def detach_rows(self, batch):
+        self.flagged[self.fresh:] = _owned_rows(batch, self.flagged[self.fresh:])
+        self.fresh = len(self.flagged)
+
+    def result(self):
+        return list(self.flagged)
+
+
+class TagKeywords:
+    """Frequency of every tag, ignoring empty and placeholder tags (tag_keywords)."""
+
+    def __init__(self):
+        self.bag = Counter()
+
+    def update(self, batch):
+        # tags are pre-split per distinct tag string: weight each string by
+        # the number of rows holding it instead of splitting every row
+        col = batch.column("tags")
+        per_tag = [0] * len(col.tag_names)
+        for tag_ids, rows in zip(col.tag_ids, col.counts()):
+            if rows:
+                for tag_id in tag_ids:
+                    per_tag[tag_id] += rows
+
+        bag = self.bag
+        for tag, count in zip(col.tag_names, per_tag):
+            if count and tag not in ("", "nan", "[none]"):
+                bag[tag] += count
+
+    def merge(self, other):
+        self.bag.update(other.bag)
+
+    def result(self):
+        return dict(self.bag)
+
+    def to_state(self):
+        return dict(self.bag)
+
+    @classmethod
+    def from_state(cls, state):
+        agg = cls()
+        agg.bag.update(state)
+        return agg
+
+
+class TrendPrediction:
+    """video_id -> crude predicted trending days; the last row of a video wins."""
+
+    def __init__(self):
+        self.pred = {}
+
+    def update(self, batch):
+        # score = views // 100000 + likes // 5000, at least 1
+        raw = map(add,
+                  map(floordiv, batch.column("views"), repeat(100000)),
+                  map(floordiv, batch.column("likes"), repeat(5000)))
+        scores = [score if score > 1 else 1 for score in raw]
+        self.pred.update(zip(batch.column("video_id"), scores))
+
+    def merge(self, other):
+        self.pred.update(other.pred)
+
+    def result(self):
+        return dict(self.pred)
+
+    def to_state(self):
+        return dict(self.pred)
+
+    @classmethod
+    def from_state(cls, state):
+        agg = cls()
+        agg.pred.update(state)
+        return agg
+
+
+class TopEngagement:
+    """Top 10 rows by views + likes + comment_count (top_ten_items)."""
+
+    def __init__(self, k=10):
+        self.top = TopK(k)
+        # global row number of the next batch's first row
+        self.offset = 0
+
+    def update(self, batch):
+        scores = list(map(add, map(add, batch.column("views"), batch.column("likes")),
+                          batch.column("comment_count")))
+        self.top.push_scores(scores, self.offset, batch.__getitem__)
+        self.offset += len(batch)
+
+    def merge(self, other):
+        self.top.merge(other.top)
+        self.offset += other.offset
+
+    def detach_rows(self, batch):
+        # the kept rows of this batch are the ones at positions past its start
+        start = self.offset - len(batch)
+        rows = sorted(pos - start for pos in self.top.positions() if pos >= start)
+        owned = dict(zip(rows, _owned_rows(batch, [batch[row] for row in rows])))
+        self.top.map_items(lambda item, pos: owned[pos - start] if pos >= start else item)
+
+    def remap_rows(self, fn):
+        rebuilt = TopK(self.top.k)
+        for score, item in self.top.pairs():
+            new_item, position = fn(item)
+            rebuilt.push(new_item, position, score)
+        self.top = rebuilt
+
+    def result(self):
+        return self.top.result()
+
+
+class EngagementHistograms:
+    """Log-scale histograms of views, likes and comment_count (engagement_histograms)."""
+
+    FIELDS = ("views", "likes", "comment_count")
+
+    def __init__(self):
+        self.hists = {field: LogHistogram() for field in self.FIELDS}
+
+    def update(self, batch):
+        for field, hist in self.hists.items():
+            hist.add(batch.column(field))
+
+    def merge(self, other):
+        for field, hist in self.hists.items():
+            hist.merge(other.hists[field])
+
+    def result(self):
+        return {field: hist.result() for field, hist in self.hists.items()}
+
+    def to_state(self):
+        return {field: hist.to_state() for field, hist in self.hists.items()}
+
+    @classmethod
+    def from_state(cls, state):
+        agg = cls()
+        agg.hists = {field: LogHistogram.from_state(hist) for field, hist in state.items()}
+        return agg
+
+
+# metric name -> aggregator class
+METRICS = {
+    "categories": CategoryCounts,
+    "channels": ChannelCount,
+    "engagement": CategoryEngagement,
+    "duration": TrendingDays,
+    "trend_profile": TrendingProfile,
+    "odd_ratio": OddLikeRatio,
+    "anomalies": Anomalies,
+    "keywords": TagKeywords,
+    "predictions": TrendPrediction,
+    "top_ten": TopEngagement,
+    "histograms": EngagementHistograms,
+}
+
+
+# ------------------------------------
+# ENGINE
+# ------------------------------------
+
+def new_aggregators(metrics=None):
+    """Return {metric name: fresh aggregator}; None means every metric."""
+    names = list(METRICS) if metrics is None else list(metrics)
+    unknown = [n for n in names if n not in METRICS]
+    if unknown:
+        raise ValueError(f"Unknown metrics: {', '.join(unknown)}")
+    return {name: METRICS[name]() for name in names}
+
+
+def run_aggregators(aggs, data_obj):
+    """
+    Feed every batch of data_obj once through all aggregators. For a
+    stream the rows an aggregator keeps are detached from their batch, so
+    memory stays bounded by what is kept, not by the batches seen.
+    """
+    stream = not isinstance(data_obj, VideoTable)
+    for batch in batches_of(data_obj):
+        for agg in aggs.values():
+            agg.update(batch)
+            if stream and hasattr(agg, "detach_rows"):
+                agg.detach_rows(batch)
+    return aggs
+
+
+def aggregate(data_obj, metrics=None):
+    """
+    Compute several metrics in one pass over a table or batch stream.
+    Returns a bundle dict: metric name -> result, e.g.
+    aggregate(data, ["categories", "engagement"]).
+    """
+    aggs = run_aggregators(new_aggregators(metrics), data_obj)
+    return {name: agg.result() for name, agg in aggs.items()}
+
+
+# ------------------------------------
+# MAP / REDUCE ACROSS PROCESSES
+# ------------------------------------
+
+def _shard_rows(row):
+    """Worker-side stand-in for a kept row: its number inside the shard."""
+    return row.row_index, row.row_index
+
+
+def _aggregate_shard(job):
+    """
+    Map step: run the aggregators over one shard in a worker process. A
+    shard is a batch table, or the rows of the pool's shared table.
+    """
+    metrics, shard = job
+    if not isinstance(shard, VideoTable):
+        shard = worker_table().take(shard)
+    aggs = run_aggregators(new_aggregators(metrics), shard)
+    # send back row numbers, not entries that would drag the shard along
+    for agg in aggs.values():
+        if hasattr(agg, "remap_rows"):
+            agg.remap_rows(_shard_rows)
+    return aggs
+
+
+def _bounded_map(pool, fn, tagged_jobs, window):
+    """
+    Like pool.map over (tag, job) pairs, yielding (tag, result) in order,
+    but with at most window jobs in flight so a stream is never read ahead.
+    """
+    pending = []
+    for tag, job in tagged_jobs:
+        pending.append((tag, pool.submit(fn, job)))
+        if len(pending) >= window:
+            tag, future = pending.pop(0)
+            yield tag, future.result()
+    for tag, future in pending:
+        yield tag, future.result()
+
+
+def _shard_row_lists(table, shards, partition):
+    """Row numbers of each shard: ranges, or sorted lists by hash of video_id."""
+    n_rows = len(table)
+    if partition == "hash":
+        # every row of a video lands in the same shard; one hash per distinct id
+        ids = table.column("video_id")
+        shard_of = [zlib.crc32(vid.encode("utf-8")) % shards for vid in ids.values]
+        buckets = [[] for _ in range(shards)]
+        for code, rows in enumerate(table.code_buckets("video_id")):
+            buckets[shard_of[code]].extend(rows)
+        for rows in buckets:
+            rows.sort()
+        return buckets
+    if partition == "range":
+        step = -(-n_rows // shards) if n_rows else 1
+        return [range(start, min(n_rows, start + step)) for start in range(0, n_rows, step)]
+    raise ValueError(f"Unknown partition scheme: {partition}")
+
+
+def _kept_rows(part):
+    """Sorted shard row numbers still held by the partial aggregators."""
+    rows = set()
+
+    def note(row):
+        rows.add(row)
+        return row, row
+
+    for agg in part.values():
+        if hasattr(agg, "remap_rows"):
+            agg.remap_rows(note)
+    return sorted(rows)
+
+
+def aggregate_parallel(data_obj, metrics=None, workers=None, partition="range"):
+    """
+    Map/reduce version of aggregate(): shards are aggregated in a process
+    pool and the partial aggregators merged in shard order.
+
+    A loaded table is handed to every worker once (pool initializer) and
+    split by row range or by hash of video_id; jobs only carry row numbers.
+    A stream from iter_batches is sharded batch by batch with a bounded
+    number of batches in flight. Merges are exact: category sums/counts
+    add up, tag counters add up, trending-date sets are unioned (a video
+    trending on days held by different shards is never double counted) and
+    top-k heaps are re-ranked on global row positions. With hash
+    partitioning dict results hold the same values but may list keys in a
+    different order.
+    """
+    names = list(new_aggregators(metrics))
+    workers = workers or os.cpu_count() or 1
+    total = new_aggregators(names)
+
+    if isinstance(data_obj, VideoTable):
+        row_lists = _shard_row_lists(data_obj, workers, partition)
+        with ProcessPoolExecutor(max_workers=workers, initializer=init_worker_table,
+                                 initargs=(data_obj,)) as pool:
+            parts = pool.map(_aggregate_shard, [(names, rows) for rows in row_lists])
+            for rows, part in zip(row_lists, parts):
+                def to_source(row, rows=rows):
+                    return data_obj[rows[row]], rows[row]
+
+                for name, agg in part.items():
+                    if hasattr(agg, "remap_rows"):
+                        agg.remap_rows(to_source)
+                    total[name].merge(agg)
+
+        if partition == "hash":
+            for agg in total.values():
+                if hasattr(agg, "flagged"):
+                    agg.flagged.sort(key=lambda entry: entry.row_index)
+        return {name: agg.result() for name, agg in total.items()}
+
+    offset = 0
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        tagged = ((batch, (names, batch)) for batch in data_obj)
+        for batch, part in _bounded_map(pool, _aggregate_shard, tagged, workers * 2):
+            # kept rows move into a small owned table so the batch can be freed
+            kept = _kept_rows(part)
+            owned = dict(zip(kept, _owned_rows(batch, [batch[row] for row in kept])))
+
+            def to_source(row, owned=owned, offset=offset):
+                return owned[row], offset + row
+
+            for name, agg in part.items():
+                if hasattr(agg, "remap_rows"):
+                    agg.remap_rows(to_source)
+                total[name].merge(agg)
+            offset += len(batch)
+
+    return {name: agg.result() for name, agg in total.items()}
@@ -0,0 +1,140 @@
+# modules/binning.py
+# Chart-side data reduction: fixed log-scale histograms that are filled a
+# column at a time and merge across chunks, and density-aware thinning of
+# scatter points, so a chart is drawn from a bounded amount of data however
+# many rows the table holds.
+
+import math
+from bisect import bisect_right
+from collections import Counter
+from itertools import repeat
+from operator import add, mul
+
+# histogram resolution: bins per power of ten, and powers of ten covered
+# (values past the last edge land in the last bin)
+BINS_PER_DECADE = 10
+DECADES = 12
+
+# default number of points a thinned scatter keeps (flagged points come on top)
+MAX_POINTS = 5000
+
+
+def log_edges(bins_per_decade=BINS_PER_DECADE, decades=DECADES):
+    """
+    Integer bin edges for counts: 0, 1, then 10 ** (i / bins_per_decade)
+    rounded up, without duplicates. Bin i holds edges[i] <= value < edges[i + 1];
+    the first bin also takes negative values.
+    """
+    edges = [0]
+    for i in range(bins_per_decade * decades + 1):
+        edge = math.ceil(10 ** (i / bins_per_decade))
+        if edge > edges[-1]:
+            edges.append(edge)
+    return edges
+
+
+def _bin_numbers(edges, values):
+    """bisect_right of every value (bin number + 1), computed in C via map."""
+    return map(bisect_right, repeat(edges), values)
+
+
+class LogHistogram:
+    """
+    Counts per log-scale bin. add() takes a whole column; two histograms
+    with the same edges merge by adding their counts.
+    """
+
+    def __init__(self, bins_per_decade=BINS_PER_DECADE, decades=DECADES):
+        self.bins_per_decade = bins_per_decade
+        self.decades = decades
+        self.edges = log_edges(bins_per_decade, decades)
+        self.counts = [0] * len(self.edges)
+
+    def add(self, values):
+        counts = self.counts
+        for number, hits in Counter(_bin_numbers(self.edges, values)).items():
+            counts[max(number - 1, 0)] += hits
+
+    def merge(self, other):
+        if other.edges != self.edges:
+            raise ValueError("Cannot merge histograms with different bins")
+        self.counts = list(map(add, self.counts, other.counts))
+
+    def total(self):
+        return sum(self.counts)
+
+    def result(self):
+        """
+        {"edges", "counts"} trimmed to the occupied range; edges has one
+        item more than counts (the last bin closes one edge further out).
+        """
+        used = [i for i, count in enumerate(self.counts) if count]
+        if not used:
+            return {"edges": [], "counts": []}
+
+        first, last = used[0], used[-1]
+        edges = self.edges[first:last + 1]
+        edges.append(self.edges[last + 1] if last + 1 < len(self.edges) else edges[-1] * 10)
+        return {"edges": edges, "counts": self.counts[first:last + 1]}
+
+    def to_state(self):
+        return {"bins_per_decade": self.bins_per_decade, "decades": self.decades,
+                "counts": list(self.counts)}
+
+    @classmethod
+    def from_state(cls, state):
+        hist = cls(state["bins_per_decade"], state["decades"])
+        hist.counts = list(state["counts"])
+        return hist
+
+
+# ------------------------------------
+# SCATTER THINNING
+# ------------------------------------
+
+def _cell_quota(occupancy, budget):
+    """
+    Largest per-cell cap q with sum(min(count, q)) <= budget (at least 1):
+    sparse cells keep every point, only dense cells are cut down.
+    """
+    low, high = 1, max(occupancy)
+    while low < high:
+        mid = (low + high + 1) // 2
+        if sum(count if count < mid else mid for count in occupancy) <= budget:
+            low = mid
+        else:
+            high = mid - 1
+    return low
+
+
+def thin_points(xs, ys, keep=(), max_points=MAX_POINTS):
+    """
+    Row numbers of a density-aware sample of the points (xs[i], ys[i]).
+    Points are grouped in log-scale cells (see log_edges); crowded cells
+    are sampled evenly down to a common cap while sparse cells (the tails
+    and outliers) are kept whole. Rows in keep are always returned.
+    Returns every row when there are at most max_points.
+    """
+    n_rows = len(xs)
+    if n_rows <= max_points:
+        return list(range(n_rows))
+
+    edges = log_edges()
+    width = len(edges) + 1
+    cells = list(map(add, map(mul, _bin_numbers(edges, xs), repeat(width)),
+                     _bin_numbers(edges, ys)))
+    keep = set(keep)
+
+    # rows grouped by cell (stable sort: row order within a cell)
+    order = sorted(range(n_rows), key=cells.__getitem__)
+    occupancy = Counter(cells)
+    quota = _cell_quota(list(occupancy.values()), max(max_points - len(keep), 1))
+
+    picked = set(keep)
+    start = 0
+    for cell in sorted(occupancy):
+        count = occupancy[cell]
+        step = -(-count // quota)
+        picked.update(order[start:start + count:step])
+        start += count
+    return sorted(picked)
@@ -0,0 +1,165 @@
+# modules/columnar.py
+# Compact columnar binary exports of the dataset and of analysis results.
+# Files use the snapshot layout (modules/snapshot.py): one typed buffer per
+# column, strings dictionary-encoded, buffers optionally zlib-compressed.
+# Uncompressed files are memory-mapped on load, so nothing is re-parsed.
+
+import json
+import os
+from array import array
+from modules.exporter import _ensure_folder
+from modules.snapshot import write_columns, read_columns
+from modules.video_entry import VideoEntry
+from modules.video_table import VideoTable, EncodedColumn, PooledTextColumn
+
+MAGIC = b"YTCOLS01"
+SUFFIX = ".ytc"
+
+
+# ------------------------------------
+# TYPED COLUMNS
+# ------------------------------------
+
+def _typed_column(values):
+    """
+    Return (column, codec) for a list of plain values: int64 or float64
+    arrays for numbers, dictionary-encoded columns for strings and, for
+    anything else (lists, None, mixed types), JSON text per value.
+    """
+    kinds = {type(v) for v in values}
+
+    if kinds <= {int}:
+        try:
+            return array("q", values), "int"
+        except OverflowError:
+            pass
+    elif kinds <= {int, float}:
+        return array("d", values), "float"
+    elif kinds <= {str}:
+        # few distinct values (categories, channels): plain value list in the
+        # header; many (titles, descriptions): packed text
+        col = EncodedColumn() if 2 * len(set(values)) <= len(values) else PooledTextColumn()
+        col.extend_values(values)
+        return col, "str"
+
+    col = PooledTextColumn()
+    col.extend_values([json.dumps(v) for v in values])
+    return col, "json"
+
+
+def _plain_values(col, codec):
+    """Inverse of _typed_column: the column as a list of Python values."""
+    if codec == "json":
+        return [json.loads(text) for text in col]
+    if codec == "str":
+        return list(col)
+    return col.tolist()
+
+
+def _entries_table(entries):
+    """Copy a list of VideoEntry rows (from any table) into one VideoTable."""
+    if isinstance(entries, VideoTable):
+        return entries
+    table = VideoTable()
+    for entry in entries:
+        table.append(entry.to_dict())
+    return table
+
+
+def _result_columns(name, result, columns):
+    """
+    Add the columns of one analysis result under "name/..." and return
+    its layout for the header. Shapes:
+      entries  list of VideoEntry      -> the rows as a dataset
+      mapping  {key: value}            -> key, value
+      records  {key: {field: value}}   -> key, one column per field
+      value    a single number/string  -> kept in the header
+    """
+    if isinstance(result, (list, VideoTable)) and all(isinstance(e, VideoEntry) for e in result):
+        for field, col in _entries_table(result).columns.items():
+            columns[f"{name}/{field}"] = col
+        return {"shape": "entries"}
+
+    if isinstance(result, dict):
+        keys = list(result)
+        rows = list(result.values())
+        if rows and all(isinstance(r, dict) for r in rows):
+            fields = list(rows[0])
+            shape = "records"
+            series = {field: [r.get(field) for r in rows] for field in fields}
+        else:
+            fields = ["value"]
+            shape = "mapping"
+            series = {"value": rows}
+
+        codecs = {}
+        columns[f"{name}/key"], codecs["key"] = _typed_column(keys)
+        for field, values in series.items():
+            columns[f"{name}/{field}"], codecs[field] = _typed_column(values)
+        return {"shape": shape, "fields": fields, "codecs": codecs}
+
+    return {"shape": "value", "value": result}
+
+
+def _result_from_columns(name, layout, columns):
+    """Rebuild one analysis result written by _result_columns."""
+    shape = layout["shape"]
+    if shape == "value":
+        return layout["value"]
+
+    if shape == "entries":
+        table = VideoTable()
+        for field in table.columns:
+            table.columns[field] = columns[f"{name}/{field}"]
+        return list(table)
+
+    codecs = layout["codecs"]
+    keys = _plain_values(columns[f"{name}/key"], codecs["key"])
+    series = [_plain_values(columns[f"{name}/{f}"], codecs[f]) for f in layout["fields"]]
+
+    if shape == "mapping":
+        return dict(zip(keys, series[0]))
+    return {key: dict(zip(layout["fields"], values))
+            for key, values in zip(keys, zip(*series))}
+
+
+# ------------------------------------
+# EXPORT / IMPORT
+# ------------------------------------
+
+def export_columnar(data_obj, save_path, compress=True):
+    """
+    Save the dataset (a VideoTable or a list of entries) as a columnar
+    binary file. compress=False keeps it memory-mappable on load.
+    """
+    _ensure_folder(os.path.dirname(save_path))
+    table = _entries_table(data_obj)
+    write_columns(table.columns, save_path, {"kind": "dataset", "rows": len(table)},
+                  magic=MAGIC, compress=compress)
+    print(f"Columnar dataset saved at: {save_path}")
+
+
+def export_results_columnar(results, save_path, compress=True):
+    """Save an analysis bundle {metric: result} (see aggregate) as a columnar binary file."""
+    _ensure_folder(os.path.dirname(save_path))
+    columns = {}
+    layout = {name: _result_columns(name, result, columns) for name, result in results.items()}
+    write_columns(columns, save_path, {"kind": "results", "results": layout},
+                  magic=MAGIC, compress=compress)
+    print(f"Columnar results saved at: {save_path}")
+
+
+def read_columnar(load_path):
+    """
+    Load a columnar export: a VideoTable for a dataset export, or the
+    {metric: result} dict for a results export.
+    """
+    header, columns = read_columns(load_path, magic=MAGIC)
+
+    if header["kind"] == "dataset":
+        table = VideoTable()
+        table.columns.update(columns)
+        return table
+
+    return {name: _result_from_columns(name, layout, columns)
+            for name, layout in header["results"].items()}
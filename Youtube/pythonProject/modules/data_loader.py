@@ -1,25 +1,293 @@
 # modules/data_loader.py
 
 import csv
+import glob
+import io
+import mmap
 import os
-from modules.video_entry import VideoEntry
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from modules.video_table import VideoTable
+from modules.snapshot import load_cached
 
-def load_dataset(path_value):
-    """Load CSV manually without pandas; returns list of VideoEntry objects."""
+# rows per batch handed out by iter_batches
+DEFAULT_BATCH_ROWS = 50000
 
-    if not os.path.exists(path_value):
-        print("File not found at given location.")
+# files smaller than this per worker are parsed serially
+MIN_PARALLEL_CHUNK = 1 << 20
+
+
+def resolve_paths(path_value):
+    """
+    Expand a file path, a glob pattern (e.g. data/*_trending.csv)
+    or a list of either into a sorted list of existing files.
+    Inputs that match nothing are left out (see missing_paths).
+    """
+    return _expand_paths(path_value)[0]
+
+
+def missing_paths(path_value):
+    """Return the paths that do not exist and the patterns that match no file."""
+    return _expand_paths(path_value)[1]
+
+
+def _expand_paths(path_value):
+    """(existing files, inputs that matched nothing) for resolve_paths."""
+    if isinstance(path_value, (list, tuple)):
+        patterns = list(path_value)
+    else:
+        patterns = [path_value]
+
+    found = []
+    missing = []
+    for pattern in patterns:
+        if glob.has_magic(pattern):
+            matches = sorted(glob.glob(pattern))
+        else:
+            matches = [pattern] if os.path.exists(pattern) else []
+        found.extend(matches)
+        if not matches:
+            missing.append(pattern)
+    return found, missing
+
+
+def _input_paths(path_value):
+    """
+    Files of path_value, or None (with a message) when any input is
+    missing: a dataset is never loaded with one of its files left out.
+    """
+    paths, missing = _expand_paths(path_value)
+    if missing or not paths:
+        print("File not found at given location:", ", ".join(missing) or path_value)
         return None
+    return paths
+
+
+def iter_rows(paths):
+    """Yield csv.DictReader rows from each file in turn."""
+    for path in paths:
+        with open(path, "r", encoding="utf-8") as file_ref:
+            for row in csv.DictReader(file_ref):
+                yield row
+
+
+def _record_chunks(paths, chunk_rows):
+    """
+    Yield (header, [record, ...]) with at most chunk_rows csv.reader records
+    per chunk; records are plain lists, no dict is built per row.
+    """
+    for path in paths:
+        with open(path, "r", encoding="utf-8") as file_ref:
+            reader = csv.reader(file_ref)
+            header = next(reader, None)
+            if header is None:
+                continue
+            while True:
+                records = list(islice(reader, chunk_rows))
+                if not records:
+                    break
+                yield header, records
+
+
+def iter_batches(path_value, batch_size=DEFAULT_BATCH_ROWS):
+    """
+    Stream the dataset as VideoTable batches of at most batch_size rows.
+    Only one batch is held in memory at a time, so the processing
+    functions can run over files larger than RAM in a single pass.
+    """
+    paths = _input_paths(path_value)
+    if paths is None:
+        return
+
+    batch = VideoTable()
+    for header, records in _record_chunks(paths, batch_size):
+        # a chunk may straddle two batches when a file ends mid-batch
+        while records:
+            room = batch_size - len(batch)
+            batch.extend_records(records[:room], header)
+            records = records[room:]
+            if len(batch) >= batch_size:
+                yield batch
+                batch = VideoTable()
+
+    if len(batch):
+        yield batch
+
+
+# ------------------------------------
+# PARALLEL PARSING
+# ------------------------------------
+
+def _count_quotes(buf, start, end, block=1 << 24):
+    """Count '"' bytes in buf[start:end], reading the mmap in 16 MB slices."""
+    total = 0
+    for pos in range(start, end, block):
+        total += buf[pos:min(end, pos + block)].count(b'"')
+    return total
+
+
+def _next_record_end(buf, pos, quotes_before):
+    """
+    Return (offset after the first newline at or after pos that lies
+    outside a quoted field, quote count up to that offset).
+    quotes_before is the number of '"' bytes in buf[:pos]; doubled quotes
+    inside a field count twice, so parity alone tells if we are inside one.
+    """
+    while True:
+        nl = buf.find(b"\n", pos)
+        if nl < 0:
+            return len(buf), quotes_before + _count_quotes(buf, pos, len(buf))
+        quotes_before += _count_quotes(buf, pos, nl)
+        pos = nl + 1
+        if quotes_before % 2 == 0:
+            return pos, quotes_before
+
+
+def split_records(path, parts):
+    """
+    Split a CSV file into byte ranges that start and end on record
+    boundaries. Returns (header_end, [(start, end), ...]); multi-line
+    quoted description/tags fields never straddle two ranges.
+    """
+    with open(path, "rb") as raw:
+        size = os.fstat(raw.fileno()).st_size
+        if size == 0:
+            return 0, []
+
+        with mmap.mmap(raw.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+            header_end, quotes = _next_record_end(buf, 0, 0)
+            step = max(1, (size - header_end) // parts)
+
+            ranges = []
+            start = header_end
+            while start < size:
+                target = min(size, start + step)
+                quotes += _count_quotes(buf, start, target)
+                end, quotes = _next_record_end(buf, target, quotes)
+                ranges.append((start, end))
+                start = end
 
-    loaded_list = []
+    return header_end, ranges
 
+
+def _read_text(path, start, end):
+    """Read a byte range and decode it the way text-mode open() would."""
+    with open(path, "rb") as raw:
+        raw.seek(start)
+        chunk = raw.read(end - start)
+    return chunk.decode("utf-8").replace("\r\n", "\n").replace("\r", "\n")
+
+
+def read_header(path):
+    """Return (CSV field names, byte offset where the first record starts)."""
+    with open(path, "rb") as raw:
+        first = raw.readline()
+    text = first.decode("utf-8").replace("\r\n", "\n").replace("\r", "\n")
+    return next(csv.reader(io.StringIO(text)), []), len(first)
+
+
+def load_byte_range(path, start, end, header):
+    """
+    Parse the records in bytes [start, end) of a CSV into a VideoTable.
+    start and end must lie on record boundaries; header gives the field names.
+    """
+    table = VideoTable()
+    table.extend_records(csv.reader(io.StringIO(_read_text(path, start, end))), header)
+    return table
+
+
+def _parse_range(job):
+    """Worker: parse one (path, start, end, header) job."""
+    return load_byte_range(*job)
+
+
+def load_parallel(paths, workers):
+    """
+    Parse files with a process pool, one job per record-aligned byte
+    range, and merge the partial tables back in original row order.
+    """
+    jobs = []
+    for path in paths:
+        parts = max(1, min(workers, os.path.getsize(path) // MIN_PARALLEL_CHUNK))
+        _, ranges = split_records(path, parts)
+        if not ranges:
+            continue
+        header, _ = read_header(path)
+        jobs.extend((path, start, end, header) for start, end in ranges)
+
+    table = VideoTable()
+    if len(jobs) == 1:
+        table.extend(_parse_range(jobs[0]))
+        return table
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        # map() returns results in submission order
+        for part in pool.map(_parse_range, jobs):
+            table.extend(part)
+    return table
+
+
+def peak_memory_kb():
+    """Peak resident memory of this process in KB (None if unsupported)."""
     try:
-        with open(path_value, "r", encoding="utf-8") as file_ref:
-            reader = csv.DictReader(file_ref)
-            for row in reader:
-                loaded_list.append(VideoEntry(row))
+        import resource
+    except ImportError:
+        return None
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS reports bytes, Linux reports kilobytes
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+def _parse_files(paths, workers):
+    """Parse CSV files into one VideoTable, in parallel if workers > 1."""
+    if workers and workers > 1:
+        return load_parallel(paths, workers)
+
+    table = VideoTable()
+    for header, records in _record_chunks(paths, DEFAULT_BATCH_ROWS):
+        table.extend_records(records, header)
+    return table
+
+
+def _load_with_snapshots(paths, workers):
+    """Open each file through its binary snapshot, re-parsing only stale ones."""
+    tables = []
+    for path in paths:
+        started = time.perf_counter()
+        table, warm = load_cached(path, lambda: _parse_files([path], workers))
+        took = time.perf_counter() - started
+        how = "snapshot (warm)" if warm else "CSV parse (cold)"
+        print(f"Loaded {path} from {how} in {took:.3f}s")
+        tables.append(table)
 
-        return loaded_list
+    if len(tables) == 1:
+        return tables[0]
+
+    merged = VideoTable()
+    for table in tables:
+        merged.extend(table)
+    return merged
+
+
+def load_dataset(path_value, workers=None, use_cache=False):
+    """
+    Load CSV manually without pandas; returns a columnar VideoTable.
+    path_value may be a single file, a glob pattern or a list of files.
+    With workers > 1 large files are parsed in parallel processes.
+    With use_cache a binary snapshot is kept next to each CSV and reused
+    while the CSV is unchanged.
+    """
+    paths = _input_paths(path_value)
+    if paths is None:
+        return None
+
+    try:
+        if use_cache:
+            return _load_with_snapshots(paths, workers)
+        return _parse_files(paths, workers)
 
     except Exception as err:
         print("Error loading dataset:", err)
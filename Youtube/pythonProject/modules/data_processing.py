@@ -1,7 +1,11 @@
 # modules/data_processing.py
 
-from collections import defaultdict, Counter
-from datetime import datetime
+import heapq
+from collections import defaultdict
+from operator import itemgetter
+from modules.result_cache import cached_aggregate
+from modules.video_table import normalise_text, split_tags
+
 
 # -------------------------------
 # BASIC PROCESSING FUNCTIONS
@@ -16,31 +20,32 @@ def count_videos(data_obj):
 
 def count_channels(data_obj):
     """Return number of distinct channels."""
-    chan_set = set()
-    for item in data_obj:
-        chan_set.add(item.channel_title)
-    return len(chan_set)
+    return cached_aggregate(data_obj, ["channels"])["channels"]
 
 
 def list_categories(data_obj):
     """Return dict: category_id -> count of videos."""
-    store = defaultdict(int)
-    for entry in data_obj:
-        store[entry.category_id] += 1
-    return dict(store)
+    return cached_aggregate(data_obj, ["categories"])["categories"]
 
 
-def fetch_video_info(data_obj, vid_input=None, title_input=None):
+def fetch_video_info(data_obj, vid_input=None, title_input=None, all_matches=False):
     """
     Retrieve video info by video_id OR title.
-    Returns first matched VideoEntry or None.
+    Returns first matched VideoEntry or None; with all_matches=True returns
+    every matching row (one per trending day) as a list.
+    Lookups go through the table's hash indexes, built on first use.
     """
-    for entry in data_obj:
-        if vid_input and entry.video_id == vid_input:
-            return entry
-        if title_input and entry.title.lower().strip() == title_input.lower().strip():
-            return entry
-    return None
+    rows = []
+    if vid_input:
+        rows.extend(data_obj.index("video_id").get(vid_input, []))
+    if title_input:
+        title_idx = data_obj.index("title", normalise_text)
+        rows.extend(title_idx.get(normalise_text(title_input), []))
+
+    rows = sorted(set(rows))
+    if all_matches:
+        return [data_obj[row] for row in rows]
+    return data_obj[rows[0]] if rows else None
 
 
 def top_ten_items(data_obj):
@@ -48,16 +53,7 @@ def top_ten_items(data_obj):
     Identify top 10 videos by combined engagement:
     engagement score = views + likes + comment_count
     """
-    scored = []
-    for entry in data_obj:
-        score_val = entry.views + entry.likes + entry.comment_count
-        scored.append((score_val, entry))
-
-    # manual sort without numpy/pandas
-    scored.sort(key=lambda x: x[0], reverse=True)
-
-    result = [item[1] for item in scored[:10]]
-    return result
+    return cached_aggregate(data_obj, ["top_ten"])["top_ten"]
 
 
 # -------------------------------
@@ -69,24 +65,7 @@ def avg_engagement_by_cat(data_obj):
     Compute average likes/dislikes/comments per category.
     Return: category_id -> {avg_likes, avg_dislikes, avg_comments}
     """
-    agg = defaultdict(lambda: {"likes": 0, "dislikes": 0, "comments": 0, "count": 0})
-
-    for entry in data_obj:
-        cat = entry.category_id
-        agg[cat]["likes"] += entry.likes
-        agg[cat]["dislikes"] += entry.dislikes
-        agg[cat]["comments"] += entry.comment_count
-        agg[cat]["count"] += 1
-
-    final = {}
-    for cat, vals in agg.items():
-        if vals["count"] > 0:
-            final[cat] = {
-                "avg_likes": vals["likes"] // vals["count"],
-                "avg_dislikes": vals["dislikes"] // vals["count"],
-                "avg_comments": vals["comments"] // vals["count"]
-            }
-    return final
+    return cached_aggregate(data_obj, ["engagement"])["engagement"]
 
 
 def trending_duration(data_obj):
@@ -94,14 +73,15 @@ def trending_duration(data_obj):
     Count how many days each video_id appears in trending list.
     Return: video_id -> number_of_days
     """
-    cache = defaultdict(set)
+    return cached_aggregate(data_obj, ["duration"])["duration"]
 
-    for entry in data_obj:
-        if entry.trending_date:
-            cache[entry.video_id].add(entry.trending_date)
 
-    result = {vid: len(days) for vid, days in cache.items()}
-    return result
+def trending_profile(data_obj):
+    """
+    Trending history of each video from its interned day bitset.
+    Return: video_id -> {days, first_day, last_day, longest_streak, gaps}
+    """
+    return cached_aggregate(data_obj, ["trend_profile"])["trend_profile"]
 
 
 def odd_like_ratio(data_obj):
@@ -109,71 +89,93 @@ def odd_like_ratio(data_obj):
     Videos where like/dislike ratio is unusually high (> 20).
     Return a list of VideoEntry.
     """
-    flagged = []
-
-    for entry in data_obj:
-        if entry.dislikes > 0:
-            ratio = entry.likes / entry.dislikes
-        else:
-            ratio = entry.likes  # if dislikes = 0, extremely high ratio
+    return cached_aggregate(data_obj, ["odd_ratio"])["odd_ratio"]
 
-        if ratio > 20:
-            flagged.append(entry)
 
-    return flagged
+def engagement_histograms(data_obj):
+    """
+    Log-scale histograms of views, likes and comment_count.
+    Return: field -> {edges, counts}
+    """
+    return cached_aggregate(data_obj, ["histograms"])["histograms"]
 
 
 # -------------------------------
 # ADVANCED PROCESSING
 # -------------------------------
 
-def recommend_similar(data_obj, base_vid):
+def similar_rows(data_obj, base_tags, base_cat, skip, top_n=5):
     """
-    Recommend videos with same category or overlapping tags.
-    Returns top 5 closest matches.
+    Return [(row, score)] of the top_n rows most similar to a tag set and
+    category, best first; rows in skip are never returned.
+    Score = 3 for the same category + 1 per shared tag; ties keep row order.
+    Only rows reached through the tag posting lists are scored one by one:
+    category-only matches all score exactly 3, so the first few rows of the
+    category bucket stand in for the rest of it.
     """
-    if not base_vid:
-        return []
+    cat_codes = data_obj.column("category_id").codes
+    base_code = data_obj.column("category_id").code_of(base_cat)
+
+    # tag intersection, one posting list per base tag
+    scores = defaultdict(int)
+    tag_idx = data_obj.tag_index()
+    for tag in base_tags:
+        for row in tag_idx.get(tag, ()):
+            scores[row] += 1
 
-    base_tags = set(t.strip().lower() for t in base_vid.tags.split("|"))
+    candidates = []
+    for row, overlap in scores.items():
+        if row not in skip:
+            candidates.append((overlap + 3 if cat_codes[row] == base_code else overlap, row))
 
-    scored = []
+    # category match without shared tags
+    taken = 0
+    for row in data_obj.index("category_id").get(base_cat, ()):
+        if taken >= top_n:
+            break
+        if row not in skip and row not in scores:
+            candidates.append((3, row))
+            taken += 1
 
-    for entry in data_obj:
-        if entry.video_id == base_vid.video_id:
-            continue
+    best = heapq.nlargest(top_n, candidates, key=lambda x: (x[0], -x[1]))
 
-        score = 0
+    # fewer than top_n related rows: pad with zero-score rows in row order
+    row = 0
+    while len(best) < top_n and row < len(data_obj):
+        if row not in skip and row not in scores and cat_codes[row] != base_code:
+            best.append((0, row))
+        row += 1
 
-        # category match
-        if entry.category_id == base_vid.category_id:
-            score += 3
+    return [(row, score) for score, row in best]
 
-        # tag intersection
-        other_tags = set(t.strip().lower() for t in entry.tags.split("|"))
-        overlap = len(base_tags.intersection(other_tags))
-        score += overlap
 
-        scored.append((score, entry))
+def recommend_similar(data_obj, base_vid, top_n=5):
+    """
+    Recommend videos with same category or overlapping tags.
+    Returns top 5 closest matches.
+    """
+    if not base_vid:
+        return []
 
-    scored.sort(key=lambda x: x[0], reverse=True)
-    return [x[1] for x in scored[:5]]
+    skip = set(data_obj.index("video_id").get(base_vid.video_id, []))
+    best = similar_rows(data_obj, split_tags(base_vid.tags), base_vid.category_id, skip, top_n)
+    return [data_obj[row] for row, _ in best]
 
 
 def tag_keywords(data_obj):
     """
     Count frequency of all tags.
     """
-    bag = Counter()
+    return cached_aggregate(data_obj, ["keywords"])["keywords"]
 
-    for entry in data_obj:
-        tags = entry.tags.split("|")
-        for t in tags:
-            clean_t = t.strip().lower()
-            if clean_t not in ("", "nan", "[none]"):
-                bag[clean_t] += 1
 
-    return dict(bag)
+def top_keywords(data_obj, top_n=200):
+    """
+    The top_n most frequent tags, picked from tag_keywords with a bounded
+    heap (equal counts keep tag_keywords order).
+    Return a list of (tag, count), most frequent first.
+    """
+    return heapq.nlargest(top_n, tag_keywords(data_obj).items(), key=itemgetter(1))
 
 
 def catch_anomalies(data_obj):
@@ -181,13 +183,7 @@ def catch_anomalies(data_obj):
     Detect videos with strange engagement patterns:
     High likes + very low comments
     """
-    anomaly_list = []
-
-    for entry in data_obj:
-        if entry.likes > 50000 and entry.comment_count < 50:
-            anomaly_list.append(entry)
-
-    return anomaly_list
+    return cached_aggregate(data_obj, ["anomalies"])["anomalies"]
 
 
 def predict_trend_days(data_obj):
@@ -196,12 +192,4 @@ def predict_trend_days(data_obj):
     More views + likes = longer prediction.
     Returns dict video_id -> predicted_days
     """
-    pred = {}
-
-    for entry in data_obj:
-        score = (entry.views // 100000) + (entry.likes // 5000)
-        if score < 1:
-            score = 1
-        pred[entry.video_id] = score
-
-    return pred
+    return cached_aggregate(data_obj, ["predictions"])["predictions"]
@@ -0,0 +1,165 @@
+# modules/export_job.py
+# Batch export: write a whole list of reports in one run. The analytics the
+# reports share are computed in a single aggregation pass, then the files
+# are written concurrently by a thread pool (every write is atomic).
+
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from modules.aggregation import METRICS
+from modules.columnar import export_columnar, export_results_columnar
+from modules.data_processing import fetch_video_info, recommend_similar
+from modules.exporter import (
+    export_video_details, export_top_ten, export_engagement_summary,
+    export_filtered_dataset, export_recommendations,
+    export_anomaly_report, export_trend_prediction, export_neighbour_table
+)
+from modules.neighbours import recommend_all
+from modules.result_cache import cached_aggregate
+
+# report name -> cached_aggregate() metric it needs (None: nothing shared)
+REPORT_METRICS = {
+    "details": None,
+    "top10": "top_ten",
+    "engagement": "engagement",
+    "filtered": None,
+    "recommendation": None,
+    "anomalies": "anomalies",
+    "prediction": "predictions",
+    "neighbours": None,
+    "columnar": None,
+    "results": None,
+}
+
+# the files usually found in exports/ (reports that need no extra input)
+DEFAULT_REPORTS = [
+    {"report": "top10", "path": "exports/top10.csv", "fmt": "csv"},
+    {"report": "engagement", "path": "exports/engagement.json"},
+    {"report": "anomalies", "path": "exports/anomaly.json"},
+    {"report": "prediction", "path": "exports/prediction.json"},
+]
+
+
+# ------------------------------------
+# SINGLE REPORTS
+# ------------------------------------
+
+def _filtered_rows(data_obj, spec):
+    """Rows for a "filtered" spec: by "category" id or "channel" name (case-insensitive)."""
+    if spec.get("category") is not None:
+        return data_obj.lookup("category_id", str(spec["category"]))
+    if spec.get("channel") is not None:
+        return data_obj.lookup("channel_title", spec["channel"], normalise=str.lower)
+    raise ValueError("a filtered report needs a category or a channel")
+
+
+def _write_report(data_obj, spec, shared):
+    """Write one report; shared holds the precomputed cached_aggregate() results."""
+    name = spec["report"]
+    path = spec["path"]
+    fmt = spec.get("fmt", "json")
+
+    if name == "details":
+        export_video_details(fetch_video_info(data_obj, vid_input=spec["video_id"]), path)
+    elif name == "top10":
+        export_top_ten(shared["top_ten"], path, fmt)
+    elif name == "engagement":
+        export_engagement_summary(shared["engagement"], path, fmt)
+    elif name == "filtered":
+        export_filtered_dataset(_filtered_rows(data_obj, spec), lambda entry: True, path, fmt)
+    elif name == "recommendation":
+        base = fetch_video_info(data_obj, vid_input=spec["video_id"])
+        export_recommendations(recommend_similar(data_obj, base), path, fmt)
+    elif name == "anomalies":
+        export_anomaly_report(shared["anomalies"], path, fmt)
+    elif name == "prediction":
+        export_trend_prediction(shared["predictions"], path, fmt)
+    elif name == "neighbours":
+        export_neighbour_table(recommend_all(data_obj), data_obj, path, fmt)
+    elif name == "columnar":
+        export_columnar(data_obj, path, spec.get("compress", True))
+    elif name == "results":
+        export_results_columnar(cached_aggregate(data_obj, METRICS), path, spec.get("compress", True))
+
+
+def _timed_report(data_obj, spec, shared):
+    """Run one report and return its timing record; errors are reported, not raised."""
+    started = time.perf_counter()
+    try:
+        _write_report(data_obj, spec, shared)
+        error = None
+    except Exception as err:
+        error = f"{type(err).__name__}: {err}"
+
+    return {
+        "report": spec["report"],
+        "path": spec["path"],
+        "seconds": round(time.perf_counter() - started, 4),
+        "ok": error is None,
+        "error": error
+    }
+
+
+# ------------------------------------
+# JOB
+# ------------------------------------
+
+def check_specs(specs):
+    """Reject unknown reports and two reports writing the same file."""
+    seen = set()
+    for spec in specs:
+        if spec.get("report") not in REPORT_METRICS:
+            raise ValueError(f"Unknown report: {spec.get('report')}")
+        if not spec.get("path"):
+            raise ValueError(f"Report {spec['report']} has no path")
+
+        path = os.path.abspath(spec["path"])
+        if path in seen:
+            raise ValueError(f"Two reports write to {spec['path']}")
+        seen.add(path)
+
+
+def run_export_job(data_obj, specs=None, workers=4):
+    """
+    Write every report in specs (default: DEFAULT_REPORTS). Each spec is
+    a dict with "report" (see REPORT_METRICS), "path", an optional "fmt"
+    and the inputs its report needs ("video_id", "category"/"channel").
+    Returns a list of timing records, the shared analytics pass first.
+    Metrics already computed for this table (menu, charts) are reused.
+    """
+    specs = DEFAULT_REPORTS if specs is None else specs
+    check_specs(specs)
+
+    started = time.perf_counter()
+    metrics = sorted({REPORT_METRICS[s["report"]] for s in specs} - {None})
+    shared = cached_aggregate(data_obj, metrics) if metrics else {}
+    timings = [{
+        "report": "shared analytics",
+        "path": None,
+        "seconds": round(time.perf_counter() - started, 4),
+        "ok": True,
+        "error": None
+    }]
+
+    # indexes are built lazily; build the shared ones before the threads
+    # start so several reports do not each build the same index
+    names = {s["report"] for s in specs}
+    if names & {"details", "recommendation"}:
+        data_obj.index("video_id")
+    if "recommendation" in names:
+        data_obj.index("category_id")
+        data_obj.tag_index()
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        futures = [pool.submit(_timed_report, data_obj, spec, shared) for spec in specs]
+        timings.extend(f.result() for f in futures)
+
+    return timings
+
+
+def show_job_timings(timings):
+    """Print the per-report timing table of run_export_job."""
+    print("\n--- EXPORT JOB ---")
+    for t in timings:
+        status = "ok" if t["ok"] else f"FAILED ({t['error']})"
+        print(f"{t['report']:<18} {t['seconds']:>8.3f}s  {t['path'] or '':<35} {status}")
@@ -3,6 +3,44 @@
 import json
 import csv
 import os
+from contextlib import contextmanager
+from itertools import islice
+from json.encoder import encode_basestring_ascii
+from operator import itemgetter
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# JSON backend for compact/jsonl output: "stdlib", "orjson" or "auto"
+# (orjson when installed). Indented output always matches json.dump.
+JSON_BACKEND = "auto"
+
+# output formats understood by the streaming writers
+EXPORT_FORMATS = ("json", "compact", "jsonl", "csv")
+
+# write buffer of every export file, and records serialised per write() call
+WRITE_BUFFER = 1 << 20
+RECORDS_PER_WRITE = 1000
+
+# CSV column order of full video records (matches _entry_to_dict)
+RECORD_FIELDS = (
+    "video_id", "title", "publish_time", "channel_title", "category_id",
+    "tags", "views", "likes", "dislikes", "comment_count", "thumbnail_link",
+    "comments_disabled", "ratings_disabled", "video_error_or_removed",
+    "description", "trending_date"
+)
+
+# CSV column order of the top-10 export
+TOP_TEN_FIELDS = (
+    "video_id", "title", "channel_title", "category_id",
+    "publish_time", "trending_date", "tags",
+    "views", "likes", "dislikes", "comment_count",
+    "thumbnail_link", "comments_disabled",
+    "ratings_disabled", "video_error_or_removed",
+    "description"
+)
 
 
 # ----------------------------------------------------
@@ -15,6 +53,28 @@ def _ensure_folder(pathname):
         os.makedirs(pathname)
 
 
+@contextmanager
+def _atomic_open(save_path, newline=None, binary=False):
+    """
+    Open a temp file next to save_path for writing (text, or bytes with
+    binary); it replaces save_path only once fully written, so readers
+    never see a half-written file. The temp file is removed on failure.
+    """
+    tmp_path = save_path + ".tmp"
+    if binary:
+        opened = open(tmp_path, "wb", buffering=WRITE_BUFFER)
+    else:
+        opened = open(tmp_path, "w", newline=newline, encoding="utf-8", buffering=WRITE_BUFFER)
+    try:
+        with opened as fh:
+            yield fh
+        os.replace(tmp_path, save_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
 def _entry_to_dict(entry):
     """Convert VideoEntry object into serialisable dict."""
     return {
@@ -37,6 +97,221 @@ def _entry_to_dict(entry):
     }
 
 
+# ----------------------------------------------------
+# SERIALISATION BACKENDS
+# ----------------------------------------------------
+
+def json_backends():
+    """Names of the JSON backends usable here."""
+    return ["stdlib", "orjson"] if orjson is not None else ["stdlib"]
+
+
+def _resolve_backend(backend=None):
+    """Pick the backend to use, falling back to the stdlib if orjson is missing."""
+    backend = backend or JSON_BACKEND
+    if backend == "auto":
+        return "orjson" if orjson is not None else "stdlib"
+    if backend == "orjson" and orjson is None:
+        print("orjson is not installed, using the standard json module.")
+        return "stdlib"
+    if backend not in ("stdlib", "orjson"):
+        raise ValueError(f"Unknown JSON backend: {backend}")
+    return backend
+
+
+def _compact_dumps(backend=None):
+    """Return obj -> compact JSON text for the chosen backend."""
+    if _resolve_backend(backend) == "orjson":
+        dumps = orjson.dumps
+        option = orjson.OPT_NON_STR_KEYS
+        return lambda obj: dumps(obj, option=option).decode("utf-8")
+    return json.JSONEncoder(separators=(",", ":")).encode
+
+
+def _value_encoder(compact=False, level=1):
+    """
+    Return value -> JSON text for a value nested level deep. Strings and
+    ints are encoded directly (in C); anything else goes to json.
+    """
+    if compact:
+        fallback = json.JSONEncoder(separators=(",", ":")).encode
+    else:
+        pad = "\n" + "    " * level
+        encode = json.JSONEncoder(indent=4).encode
+        fallback = lambda value: encode(value).replace("\n", pad)
+
+    def encode_value(value):
+        kind = type(value)
+        if kind is str:
+            return encode_basestring_ascii(value)
+        if kind is int:
+            return int.__repr__(value)
+        return fallback(value)
+
+    return encode_value
+
+
+def compile_record_template(fields, compact=False, depth=1):
+    """
+    Precompile the JSON text around records that have exactly these keys
+    in this order (e.g. RECORD_FIELDS for _entry_to_dict), so only the
+    values are encoded per record. The output equals json.dumps(record,
+    indent=4) nested depth levels deep, or the compact form.
+    Returns render(record) -> str.
+    """
+    keys = [encode_basestring_ascii(f).replace("%", "%%") for f in fields]
+    if compact:
+        layout = "{" + ",".join(k + ":%s" for k in keys) + "}"
+    else:
+        inner = "\n" + "    " * (depth + 1)
+        layout = "{" + ",".join(inner + k + ": %s" for k in keys) + "\n" + "    " * depth + "}"
+
+    encode_value = _value_encoder(compact, depth + 1)
+    values = itemgetter(*fields)
+    if len(fields) == 1:
+        return lambda record: layout % encode_value(values(record))
+    return lambda record: layout % tuple(map(encode_value, values(record)))
+
+
+def _record_dumps(fmt, schema=None, backend=None, depth=1):
+    """Return record -> JSON text for one output format."""
+    if fmt == "json":
+        if schema:
+            return compile_record_template(schema, depth=depth)
+        pad = "\n" + "    " * depth
+        encode = json.JSONEncoder(indent=4).encode
+        return lambda rec: encode(rec).replace("\n", pad)
+
+    if schema and _resolve_backend(backend) == "stdlib":
+        return compile_record_template(schema, compact=True)
+    return _compact_dumps(backend)
+
+
+# ----------------------------------------------------
+# STREAMING WRITERS
+# ----------------------------------------------------
+
+def _json_pieces(records, fmt, wrap_key, dumps):
+    """
+    Yield the text of a JSON array, one record at a time.
+    "json" gives the same layout as json.dump(..., indent=4); "compact"
+    drops all optional whitespace. With wrap_key the array is written as
+    the only member of an object: {wrap_key: [...]}.
+    """
+    if fmt == "compact":
+        head, sep, tail, empty = "[", ",", "]", "[]"
+        if wrap_key is not None:
+            key = "{" + json.dumps(wrap_key) + ":"
+            head, tail, empty = key + head, tail + "}", key + empty + "}"
+    else:
+        # nested records are indented one level deeper when wrapped
+        pad = "\n    " if wrap_key is None else "\n        "
+        head, sep, tail, empty = "[" + pad, "," + pad, pad[:-4] + "]", "[]"
+        if wrap_key is not None:
+            key = "{\n    " + json.dumps(wrap_key) + ": "
+            head, tail, empty = key + head, tail + "\n}", key + empty + "\n}"
+
+    first = True
+    for rec in records:
+        yield (head if first else sep) + dumps(rec)
+        first = False
+    yield empty if first else tail
+
+
+def _jsonl_pieces(records, dumps):
+    for rec in records:
+        yield dumps(rec) + "\n"
+
+
+def _write_pieces(pieces, save_path):
+    """Write text pieces through the export buffer, RECORDS_PER_WRITE at a time."""
+    with _atomic_open(save_path) as jf:
+        while True:
+            block = "".join(islice(pieces, RECORDS_PER_WRITE))
+            if not block:
+                break
+            jf.write(block)
+
+
+def write_records(records, save_path, fmt="json", fields=RECORD_FIELDS, wrap_key=None,
+                  schema=None, backend=None):
+    """
+    Stream dict records to save_path as they are produced; records may be
+    any iterable (typically a generator), so memory use does not grow with
+    the number of rows. fmt is one of EXPORT_FORMATS; fields sets the CSV
+    columns and wrap_key wraps a JSON array in an object. schema, when
+    every record has exactly those keys in that order, enables the
+    precompiled record template; backend overrides JSON_BACKEND.
+    Returns the number of records written.
+    """
+    fmt = fmt.lower()
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format: {fmt}")
+
+    _ensure_folder(os.path.dirname(save_path))
+    count = 0
+
+    def counted():
+        nonlocal count
+        for rec in records:
+            count += 1
+            yield rec
+
+    if fmt == "csv":
+        with _atomic_open(save_path, newline="") as cf:
+            wr = csv.writer(cf)
+            wr.writerow(fields)
+            rows = ([rec.get(f) for f in fields] for rec in counted())
+            while True:
+                block = list(islice(rows, RECORDS_PER_WRITE))
+                if not block:
+                    break
+                wr.writerows(block)
+        return count
+
+    depth = 1 if wrap_key is None else 2
+    dumps = _record_dumps(fmt, schema, backend, depth)
+    if fmt == "jsonl":
+        pieces = _jsonl_pieces(counted(), dumps)
+    else:
+        pieces = _json_pieces(counted(), fmt, wrap_key, dumps)
+
+    _write_pieces(pieces, save_path)
+    return count
+
+
+def write_mapping(mapping, save_path, fmt="json", backend=None):
+    """
+    Write a {key: value} dict as one JSON object ("json" matches
+    json.dump(..., indent=4), "compact" has no whitespace), pair by pair.
+    """
+    fmt = fmt.lower()
+    if fmt not in ("json", "compact"):
+        raise ValueError(f"Unknown export format for a mapping: {fmt}")
+
+    _ensure_folder(os.path.dirname(save_path))
+
+    if fmt == "compact":
+        _write_pieces(iter([_compact_dumps(backend)(mapping)]), save_path)
+        return
+
+    if not all(type(key) is str for key in mapping):
+        # json.dump converts non-string keys itself; not worth a template
+        _write_pieces(iter([json.dumps(mapping, indent=4)]), save_path)
+        return
+
+    encode_value = _value_encoder(level=1)
+
+    def pieces():
+        first = True
+        for key, value in mapping.items():
+            head = "{\n    " if first else ",\n    "
+            yield head + encode_basestring_ascii(key) + ": " + encode_value(value)
+            first = False
+        yield "{}" if first else "\n}"
+
+    _write_pieces(pieces(), save_path)
+
 
 # ----------------------------------------------------
 # BASIC EXPORTS
@@ -51,8 +326,8 @@ def export_video_details(entry, save_path):
     folder = os.path.dirname(save_path)
     _ensure_folder(folder)
 
-    with open(save_path, "w", encoding="utf-8") as jf:
-        json.dump(_entry_to_dict(entry), jf, indent=4)
+    render = compile_record_template(RECORD_FIELDS, depth=0)
+    _write_pieces(iter([render(_entry_to_dict(entry))]), save_path)
 
     print(f"Saved video details at: {save_path}")
 
@@ -60,48 +335,14 @@ def export_video_details(entry, save_path):
 def export_top_ten(top_list, save_path, mode="json"):
     """
     Save top 10 videos in JSON or CSV format.
-    top_list contains raw dictionary entries.
+    mode may also be "compact" or "jsonl"; anything else writes CSV.
     """
-    folder = os.path.dirname(save_path)
-    _ensure_folder(folder)
+    fmt = mode.lower()
+    if fmt not in ("json", "compact", "jsonl"):
+        fmt = "csv"
 
-    if mode.lower() == "json":
-        block = [_entry_to_dict(e) for e in top_list]
-        with open(save_path, "w", encoding="utf-8") as jf:
-            json.dump(block, jf, indent=4)
-
-
-    else:  # CSV mode
-        with open(save_path, "w", newline="", encoding="utf-8") as cf:
-            wr = csv.writer(cf)
-            # Write ALL columns you want in CSV
-            wr.writerow([
-                "video_id", "title", "channel_title", "category_id",
-                "publish_time", "trending_date", "tags",
-                "views", "likes", "dislikes", "comment_count",
-                "thumbnail_link", "comments_disabled",
-                "ratings_disabled", "video_error_or_removed",
-                "description"
-            ])
-            for e in top_list:
-                wr.writerow([
-                    e.video_id,
-                    e.title,
-                    e.channel_title,
-                    e.category_id,
-                    e.publish_time,
-                    e.trending_date,
-                    e.tags,
-                    e.views,
-                    e.likes,
-                    e.dislikes,
-                    e.comment_count,
-                    e.thumbnail_link,
-                    e.comments_disabled,
-                    e.ratings_disabled,
-                    e.video_error_or_removed,
-                    e.description
-                ])
+    write_records((_entry_to_dict(e) for e in top_list), save_path, fmt,
+                  fields=TOP_TEN_FIELDS, schema=RECORD_FIELDS)
 
     print(f"Top-10 list saved at: {save_path}")
 
@@ -110,29 +351,21 @@ def export_top_ten(top_list, save_path, mode="json"):
 # INTERMEDIATE EXPORTS
 # ----------------------------------------------------
 
-def export_engagement_summary(stats_dict, save_path):
+def export_engagement_summary(stats_dict, save_path, fmt="json"):
     """Export aggregated category-level engagement metrics into JSON."""
-    folder = os.path.dirname(save_path)
-    _ensure_folder(folder)
-
-    with open(save_path, "w", encoding="utf-8") as jf:
-        json.dump(stats_dict, jf, indent=4)
+    write_mapping(stats_dict, save_path, fmt)
 
     print(f"Engagement summary saved at: {save_path}")
 
 
-def export_filtered_dataset(data_list, filter_fn, save_path):
+def export_filtered_dataset(data_list, filter_fn, save_path, fmt="json"):
     """
     Export filtered dataset based on category/channel/trending period.
     filter_fn must be a function that accepts entry and returns True/False.
+    Rows are streamed to disk as they pass the filter (fmt: see write_records).
     """
-    filtered = [_entry_to_dict(e) for e in data_list if filter_fn(e)]
-
-    folder = os.path.dirname(save_path)
-    _ensure_folder(folder)
-
-    with open(save_path, "w", encoding="utf-8") as jf:
-        json.dump(filtered, jf, indent=4)
+    filtered = (_entry_to_dict(e) for e in data_list if filter_fn(e))
+    write_records(filtered, save_path, fmt, schema=RECORD_FIELDS)
 
     print(f"Filtered dataset saved at: {save_path}")
 
@@ -141,41 +374,46 @@ def export_filtered_dataset(data_list, filter_fn, save_path):
 # ADVANCED EXPORTS
 # ----------------------------------------------------
 
-def export_recommendations(rec_list, save_path):
+def export_recommendations(rec_list, save_path, fmt="json"):
     """Export recommended videos for a selected base video."""
-    block = [_entry_to_dict(v) for v in rec_list]
+    write_records((_entry_to_dict(v) for v in rec_list), save_path, fmt, schema=RECORD_FIELDS)
 
-    folder = os.path.dirname(save_path)
-    _ensure_folder(folder)
+    print(f"Recommendations saved at: {save_path}")
 
-    with open(save_path, "w", encoding="utf-8") as jf:
-        json.dump(block, jf, indent=4)
 
-    print(f"Recommendations saved at: {save_path}")
+def export_neighbour_table(neighbours, data_obj, save_path, fmt="json"):
+    """
+    Export the all-videos recommendation table from recommend_all:
+    { video_id: [ {video_id, title, score}, ... ] }
+    """
+    block = {}
+    for vid, best in neighbours.items():
+        block[vid] = [
+            {"video_id": data_obj[row].video_id, "title": data_obj[row].title, "score": score}
+            for row, score in best
+        ]
 
+    write_mapping(block, save_path, fmt)
 
-def export_anomaly_report(flagged_list, save_path):
-    """Export anomaly detection results into a JSON report."""
-    anomalies = [_entry_to_dict(v) for v in flagged_list]
+    print(f"Neighbour table saved at: {save_path}")
 
-    folder = os.path.dirname(save_path)
-    _ensure_folder(folder)
 
-    with open(save_path, "w", encoding="utf-8") as jf:
-        json.dump({"anomalies": anomalies}, jf, indent=4)
+def export_anomaly_report(flagged_list, save_path, fmt="json"):
+    """
+    Export anomaly detection results into a JSON report: {"anomalies": [...]}.
+    JSON Lines and CSV output hold the flagged rows only.
+    """
+    anomalies = (_entry_to_dict(v) for v in flagged_list)
+    write_records(anomalies, save_path, fmt, wrap_key="anomalies", schema=RECORD_FIELDS)
 
     print(f"Anomaly report saved at: {save_path}")
 
 
-def export_trend_prediction(pred_dict, save_path):
+def export_trend_prediction(pred_dict, save_path, fmt="json"):
     """
     Export predicted trending duration for videos.
     pred_dict should be: { video_id: predicted_days }
     """
-    folder = os.path.dirname(save_path)
-    _ensure_folder(folder)
-
-    with open(save_path, "w", encoding="utf-8") as jf:
-        json.dump(pred_dict, jf, indent=4)
+    write_mapping(pred_dict, save_path, fmt)
 
     print(f"Trend prediction saved at: {save_path}")
@@ -0,0 +1,107 @@
+# modules/incremental.py
+# Persisted running aggregates, so a daily trending CSV (or rows appended to
+# an existing one) only costs the size of the new data, not of the history.
+
+import json
+import os
+from modules.aggregation import METRICS, new_aggregators
+from modules.data_loader import resolve_paths, missing_paths, read_header, load_byte_range, iter_batches
+from modules.exporter import _ensure_folder, _atomic_open
+
+# aggregates kept by default: list_categories, avg_engagement_by_cat,
+# trending_duration and tag_keywords
+INCREMENTAL_METRICS = ("categories", "engagement", "duration", "keywords")
+
+STATE_VERSION = 2
+
+
+class IncrementalState:
+    """
+    Mergeable aggregate state saved as JSON at state_path.
+    For every ingested file the number of bytes already applied is kept,
+    so ingesting the same path again only reads the rows appended since.
+    """
+
+    def __init__(self, state_path, metrics=INCREMENTAL_METRICS):
+        self.state_path = state_path
+        self.metrics = tuple(metrics)
+        self.sources = {}
+        self.aggs = new_aggregators(self.metrics)
+
+        if os.path.exists(state_path):
+            self.load()
+
+    # ------------------------------------
+    # PERSISTENCE
+    # ------------------------------------
+
+    def load(self):
+        """Read the saved state, replacing what is in memory."""
+        with open(self.state_path, "r", encoding="utf-8") as jf:
+            saved = json.load(jf)
+
+        if saved.get("version") != STATE_VERSION:
+            raise ValueError(f"Unsupported state version in {self.state_path}")
+
+        self.metrics = tuple(saved["metrics"])
+        self.sources = saved["sources"]
+        self.aggs = {name: METRICS[name].from_state(state)
+                     for name, state in saved["metrics"].items()}
+
+    def save(self):
+        """Write the state atomically (temp file, then rename)."""
+        _ensure_folder(os.path.dirname(self.state_path))
+
+        block = {
+            "version": STATE_VERSION,
+            "sources": self.sources,
+            "metrics": {name: agg.to_state() for name, agg in self.aggs.items()}
+        }
+        with _atomic_open(self.state_path) as jf:
+            json.dump(block, jf)
+
+    # ------------------------------------
+    # UPDATES
+    # ------------------------------------
+
+    def ingest(self, path_value, save=True):
+        """
+        Apply the new rows of one or more delta files (path, glob or list).
+        Returns the number of rows applied.
+        """
+        missing = missing_paths(path_value)
+        if missing:
+            raise ValueError(f"No file found for: {', '.join(missing)}")
+
+        applied = 0
+        for path in resolve_paths(path_value):
+            key = os.path.abspath(path)
+            size = os.path.getsize(path)
+            header, header_end = read_header(path)
+            done = self.sources.get(key, {}).get("offset", header_end)
+
+            if size < done:
+                raise ValueError(f"{path} shrank since it was ingested; rebuild the state")
+            if size == done:
+                continue
+
+            if done == header_end:
+                # a file seen for the first time is streamed in batches
+                deltas = iter_batches([path])
+            else:
+                deltas = [load_byte_range(path, done, size, header)]
+
+            for delta in deltas:
+                for agg in self.aggs.values():
+                    agg.update(delta)
+                applied += len(delta)
+
+            self.sources[key] = {"offset": size}
+
+        if save:
+            self.save()
+        return applied
+
+    def results(self):
+        """Return the current bundle: metric name -> result."""
+        return {name: agg.result() for name, agg in self.aggs.items()}
@@ -0,0 +1,58 @@
+# modules/neighbours.py
+# Batch mode of recommend_similar: the top-n similar videos for every video
+# in the catalogue, computed in one job instead of N separate calls.
+
+from concurrent.futures import ProcessPoolExecutor
+from modules.data_processing import similar_rows
+from modules.workers import init_worker_table, worker_table
+
+
+def _neighbours_for(table, rows, top_n):
+    """
+    Neighbour lists for a chunk of query rows.
+    Tag overlap is the row-by-row sparse product of the video x tag
+    incidence matrix with its transpose: each query only touches the
+    posting lists of its own tags.
+    """
+    vid_idx = table.index("video_id")
+    ids = table.column("video_id")
+    tags = table.column("tags")
+    cats = table.column("category_id")
+
+    found = []
+    for row in rows:
+        skip = set(vid_idx[ids[row]])
+        found.append(similar_rows(table, tags.tag_set(row), cats[row], skip, top_n))
+    return found
+
+
+def _worker_chunk(job):
+    rows, top_n = job
+    return _neighbours_for(worker_table(), rows, top_n)
+
+
+def recommend_all(data_obj, top_n=5, chunk_size=2000, workers=None):
+    """
+    Compute recommend_similar for every distinct video at once.
+    Returns dict: video_id -> [(row, score), ...] best first, using each
+    video's first row as the query (the row fetch_video_info returns).
+    Queries run in chunks of chunk_size, so only one chunk of results is
+    pending at a time per worker; with workers > 1 chunks are sharded
+    over a process pool.
+    """
+    query_rows = [rows[0] for rows in data_obj.index("video_id").values()]
+    chunks = [query_rows[i:i + chunk_size] for i in range(0, len(query_rows), chunk_size)]
+
+    if workers and workers > 1 and len(chunks) > 1:
+        with ProcessPoolExecutor(max_workers=workers, initializer=init_worker_table,
+                                 initargs=(data_obj,)) as pool:
+            results = list(pool.map(_worker_chunk, [(chunk, top_n) for chunk in chunks]))
+    else:
+        results = [_neighbours_for(data_obj, chunk, top_n) for chunk in chunks]
+
+    ids = data_obj.column("video_id")
+    neighbours = {}
+    for chunk, found in zip(chunks, results):
+        for row, best in zip(chunk, found):
+            neighbours[ids[row]] = best
+    return neighbours
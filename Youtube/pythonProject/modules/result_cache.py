@@ -0,0 +1,124 @@
+# modules/result_cache.py
+# Shared memo of analysis results. Processing functions, charts and exports
+# all ask for results through here, so a metric computed once for a loaded
+# table is reused instead of re-scanning the rows. Entries are keyed on the
+# table's (table_id, version): adding rows makes old entries stale (they are
+# dropped on the next store), and reloading a dataset drops everything
+# explicitly (invalidate).
+
+import multiprocessing
+import threading
+from collections import OrderedDict
+from modules.aggregation import aggregate, aggregate_parallel
+from modules.video_table import VideoTable
+
+# results kept before the least recently used one is dropped
+CACHE_SIZE = 32
+
+# processes cached_aggregate may use (main.py and cli.py set it from their
+# worker count), and the table size from which the pool pays off
+AGGREGATE_WORKERS = 1
+PARALLEL_MIN_ROWS = 200000
+
+
+class ResultCache:
+    """
+    LRU cache of results per dataset version, with hit/miss counters.
+    Cached results are shared between callers: treat them as read-only.
+    Thread-safe (the export job reads it from several threads).
+    """
+
+    def __init__(self, maxsize=CACHE_SIZE):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(data_obj, name):
+        return data_obj.table_id, data_obj.version, name
+
+    def lookup(self, data_obj, name):
+        """Return (True, result) when name is cached for this table version, else (False, None)."""
+        key = self._key(data_obj, name)
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return True, self._entries[key]
+            self.misses += 1
+            return False, None
+
+    def store(self, data_obj, name, result):
+        """Keep result for this table version, evicting the least recently used entries."""
+        key = self._key(data_obj, name)
+        with self._lock:
+            # results of older versions of this table can never be hit again
+            for old in [k for k in self._entries if k[0] == key[0] and k[1] != key[1]]:
+                del self._entries[old]
+            self._entries[key] = result
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, data_obj=None):
+        """Drop every entry of data_obj, or everything when data_obj is None."""
+        with self._lock:
+            if data_obj is None:
+                self._entries.clear()
+                return
+            for key in [k for k in self._entries if k[0] == data_obj.table_id]:
+                del self._entries[key]
+
+    def stats(self):
+        """Counters as a dict: hits, misses, evictions, entries, maxsize."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "maxsize": self.maxsize
+            }
+
+
+# the cache shared by data_processing, visualisation and the exporters
+RESULTS = ResultCache()
+
+
+def cached_aggregate(data_obj, metrics, cache=RESULTS):
+    """
+    aggregate() through the cache: the metrics not cached yet for this
+    table version are computed together in one pass, then stored one by one.
+    Large tables are aggregated by aggregate_parallel with AGGREGATE_WORKERS
+    processes.
+    Returns {metric name: result} in the order of metrics.
+    """
+    metrics = list(metrics)
+    if not isinstance(data_obj, VideoTable):
+        return aggregate(data_obj, metrics)
+
+    results = {}
+    missing = []
+    for name in metrics:
+        found, result = cache.lookup(data_obj, ("metric", name))
+        if found:
+            results[name] = result
+        else:
+            missing.append(name)
+
+    if missing:
+        # only the main process fans out: pool workers (charts) stay serial
+        if (AGGREGATE_WORKERS > 1 and len(data_obj) >= PARALLEL_MIN_ROWS
+                and multiprocessing.parent_process() is None):
+            computed = aggregate_parallel(data_obj, missing, AGGREGATE_WORKERS)
+        else:
+            computed = aggregate(data_obj, missing)
+        for name, result in computed.items():
+            cache.store(data_obj, ("metric", name), result)
+            results[name] = result
+
+    return {name: results[name] for name in metrics}
@@ -0,0 +1,221 @@
+# modules/snapshot.py
+# Binary snapshot of a parsed VideoTable, kept next to the source CSV so an
+# unchanged file can be re-opened without parsing it again.
+#
+# Layout:  MAGIC | header length (8 bytes) | JSON header | column buffers
+# Every buffer starts on an 8-byte boundary and is memory-mapped on load.
+# The header records the payload length and every buffer's extent, so a
+# truncated file is rejected before any buffer is mapped.
+# The same layout (write_columns / read_columns) backs the columnar
+# exports in modules/columnar.py.
+
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+import zlib
+from array import array
+from modules.exporter import _atomic_open
+from modules.video_table import VideoTable, EncodedColumn, PooledTextColumn, TagsColumn
+
+MAGIC = b"YTSNAP02"
+SUFFIX = ".snapshot"
+ALIGN = 8
+
+
+def snapshot_path(csv_path):
+    """Location of the snapshot belonging to a CSV file."""
+    return csv_path + SUFFIX
+
+
+def source_key(csv_path):
+    """Identify a CSV by path, size, mtime and a hash of its bytes."""
+    stat = os.stat(csv_path)
+    digest = hashlib.blake2b(digest_size=16)
+    with open(csv_path, "rb") as raw:
+        for block in iter(lambda: raw.read(1 << 20), b""):
+            digest.update(block)
+
+    return {
+        "path": os.path.abspath(csv_path),
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "hash": digest.hexdigest()
+    }
+
+
+def _padding(length):
+    return -length % ALIGN
+
+
+def _column_buffers(col):
+    """Return (column meta, [(buffer name, buffer)]) for one column."""
+    if isinstance(col, EncodedColumn):
+        return {"kind": "encoded", "values": col.values}, [("codes", col.codes)]
+    if isinstance(col, PooledTextColumn):
+        kind = "tags" if isinstance(col, TagsColumn) else "pooled"
+        return {"kind": kind}, [("codes", col.codes),
+                                ("offsets", col.values.offsets), ("blob", col.values.blob)]
+    return {"kind": "numeric"}, [("data", col)]
+
+
+# ------------------------------------
+# WRITE / READ
+# ------------------------------------
+
+def write_columns(columns, save_path, header, magic=MAGIC, compress=False):
+    """
+    Write named columns and a JSON header atomically (temp file, then
+    rename). With compress every buffer is zlib-compressed on its own;
+    such buffers are inflated on load instead of being memory-mapped.
+    """
+    header = dict(header, byteorder=sys.byteorder, columns={})
+    pieces = []
+    offset = 0
+
+    for name, col in columns.items():
+        meta, buffers = _column_buffers(col)
+        meta["buffers"] = {}
+        for buf_name, buf in buffers:
+            view = memoryview(buf)
+            spec = [offset, view.nbytes, view.format]
+            if compress:
+                view = memoryview(zlib.compress(view))
+                spec.append(view.nbytes)
+            meta["buffers"][buf_name] = spec
+            pieces.append(view)
+            offset += view.nbytes + _padding(view.nbytes)
+        header["columns"][name] = meta
+
+    header["payload"] = offset
+    head_bytes = json.dumps(header).encode("utf-8")
+
+    with _atomic_open(save_path, binary=True) as out:
+        out.write(magic)
+        out.write(struct.pack("<Q", len(head_bytes)))
+        out.write(head_bytes)
+        out.write(b"\0" * _padding(len(magic) + 8 + len(head_bytes)))
+        for view in pieces:
+            out.write(view)
+            out.write(b"\0" * _padding(view.nbytes))
+
+
+def _check_layout(buf, magic):
+    """
+    Validate the frame of a mapped file against its own header. Returns
+    (header, payload start); raises ValueError for a foreign, truncated
+    or inconsistent file.
+    """
+    head_start = len(magic) + 8
+    if len(buf) < head_start or buf[:len(magic)] != magic:
+        raise ValueError("not a dataset snapshot")
+
+    (head_len,) = struct.unpack_from("<Q", buf, len(magic))
+    if head_start + head_len > len(buf):
+        raise ValueError("truncated snapshot header")
+    header = json.loads(buf[head_start:head_start + head_len])
+    if header["byteorder"] != sys.byteorder:
+        raise ValueError("snapshot written on a different byte order")
+
+    base = head_start + head_len + _padding(head_start + head_len)
+    available = len(buf) - base
+    if header.get("payload", 0) > available:
+        raise ValueError("truncated snapshot")
+    for meta in header["columns"].values():
+        for start, length, fmt, *packed in meta["buffers"].values():
+            stored = packed[0] if packed else length
+            if start < 0 or stored < 0 or start + stored > available:
+                raise ValueError("snapshot buffer out of bounds")
+            if not packed and length % struct.calcsize(fmt):
+                raise ValueError("snapshot buffer of a partial item")
+    return header, base
+
+
+def read_columns(load_path, magic=MAGIC):
+    """
+    Open a file written by write_columns. Returns (header, {name: column});
+    uncompressed columns are read-only views into the mapped file, so
+    nothing is copied.
+    """
+    with open(load_path, "rb") as raw:
+        buf = mmap.mmap(raw.fileno(), 0, access=mmap.ACCESS_READ)
+
+    try:
+        header, base = _check_layout(buf, magic)
+    except Exception:
+        buf.close()
+        raise
+
+    view = memoryview(buf)
+
+    def piece(spec):
+        start, length, fmt = spec[:3]
+        if len(spec) > 3:
+            # compressed buffer: inflate into an owned, writable copy
+            raw = zlib.decompress(view[base + start:base + start + spec[3]])
+            return bytearray(raw) if fmt == "B" else array(fmt, raw)
+        return view[base + start:base + start + length].cast(fmt)
+
+    columns = {}
+    for name, meta in header["columns"].items():
+        parts = meta["buffers"]
+        if meta["kind"] == "encoded":
+            col = EncodedColumn()
+            col.codes = piece(parts["codes"])
+            for value in meta["values"]:
+                col.code_for(value)
+        elif meta["kind"] in ("pooled", "tags"):
+            col = TagsColumn() if meta["kind"] == "tags" else PooledTextColumn()
+            col.codes = piece(parts["codes"])
+            col.values.offsets = piece(parts["offsets"])
+            col.values.blob = piece(parts["blob"])
+            # hashes and tag ids are per process: rebuilt from the distinct values
+            col.rebuild_lookup()
+        else:
+            col = piece(parts["data"])
+        columns[name] = col
+
+    return header, columns
+
+
+def write_snapshot(table, save_path, key):
+    """Write a table snapshot atomically (temp file, then rename)."""
+    write_columns(table.columns, save_path, {"key": key, "rows": len(table)})
+
+
+def read_snapshot(load_path):
+    """
+    Memory-map a snapshot. Returns (key, VideoTable); the table's columns
+    are read-only views into the mapped file, so nothing is copied.
+    """
+    header, columns = read_columns(load_path)
+    table = VideoTable()
+    table.columns.update(columns)
+    return header["key"], table
+
+
+def load_cached(csv_path, parse_fn):
+    """
+    Return (table, from_snapshot). A snapshot is used only when its key
+    matches the CSV; otherwise parse_fn() is called and a fresh snapshot
+    replaces the stale one.
+    """
+    key = source_key(csv_path)
+    snap = snapshot_path(csv_path)
+
+    if os.path.exists(snap):
+        try:
+            stored_key, table = read_snapshot(snap)
+            if stored_key == key:
+                return table, True
+        except Exception:
+            pass  # unreadable, damaged or old format: rebuild below
+
+    table = parse_fn()
+    try:
+        write_snapshot(table, snap, key)
+    except OSError as err:
+        print("Could not write snapshot:", err)
+    return table, False
@@ -0,0 +1,75 @@
+# modules/topk.py
+# Bounded top-k selection that works on streams and chunks.
+
+import heapq
+
+
+class TopK:
+    """
+    Keep the k highest-scoring items seen so far in a min-heap.
+    Memory is O(k) and each push costs O(log k).
+
+    Every item carries a position (e.g. its global row number). On equal
+    scores the lower position wins, which reproduces a stable descending
+    sort, so results do not depend on chunking or merge order as long as
+    positions are globally unique.
+    """
+
+    def __init__(self, k=10, key=None):
+        self.k = k
+        self.key = key
+        # min-heap of (score, -position, item); the root is the weakest entry
+        self._heap = []
+
+    def push(self, item, position, score=None):
+        """Offer one item; score defaults to key(item)."""
+        if score is None:
+            score = self.key(item)
+        entry = (score, -position, item)
+
+        if self.k <= 0:
+            return
+        if len(self._heap) < self.k:
+            heapq.heappush(self._heap, entry)
+        elif entry[:2] > self._heap[0][:2]:
+            heapq.heapreplace(self._heap, entry)
+
+    def extend(self, items, start=0):
+        """Offer items in order; positions are start, start + 1, ..."""
+        for offset, item in enumerate(items):
+            self.push(item, start + offset)
+
+    def push_scores(self, scores, start=0, item_fn=None):
+        """
+        Offer a whole column of scores at once. Only the chunk's own top k
+        rows (picked by heapq.nlargest, in C) reach the heap; item_fn maps
+        a chunk row number to the stored item (default: the row number).
+        """
+        best = heapq.nlargest(self.k, range(len(scores)), key=scores.__getitem__)
+        for row in best:
+            item = item_fn(row) if item_fn else row
+            self.push(item, start + row, scores[row])
+
+    def merge(self, other):
+        """Fold in the state of another TopK (e.g. from another partition)."""
+        for score, neg_pos, item in other._heap:
+            self.push(item, -neg_pos, score)
+
+    def positions(self):
+        """Positions of the kept items, in no particular order."""
+        return [-neg_pos for _, neg_pos, _ in self._heap]
+
+    def map_items(self, fn):
+        """Replace every item by fn(item, position); scores and positions stay."""
+        self._heap = [(score, neg_pos, fn(item, -neg_pos)) for score, neg_pos, item in self._heap]
+
+    def pairs(self):
+        """Return [(score, item)] best first."""
+        return [(score, item) for score, _, item in sorted(self._heap, key=lambda e: e[:2], reverse=True)]
+
+    def result(self):
+        """Return the kept items best first."""
+        return [item for _, item in self.pairs()]
+
+    def __len__(self):
+        return len(self._heap)
@@ -0,0 +1,107 @@
+# modules/trend_days.py
+# Compact per-video record of trending days: dates are parsed once into day
+# ordinals and each video keeps a bitset (one bit per day since its first).
+
+from datetime import date
+from functools import lru_cache
+
+
+@lru_cache(maxsize=4096)
+def parse_trending_date(text):
+    """
+    Convert a YY.DD.MM trending date (e.g. 17.14.11) into a day ordinal.
+    Returns None when the text is not a valid date. Results are cached, so
+    each distinct date string is parsed only once.
+    """
+    try:
+        yy, dd, mm = text.split(".")
+        return date(2000 + int(yy), int(mm), int(dd)).toordinal()
+    except (ValueError, TypeError):
+        return None
+
+
+def ordinal_to_text(day):
+    """Format a day ordinal back to ISO yyyy-mm-dd."""
+    return date.fromordinal(day).isoformat()
+
+
+class TrendDays:
+    """
+    Set of trending days of one video as a Python int bitset.
+    Bit i set means the video trended on day (base + i).
+    """
+
+    __slots__ = ("base", "bits")
+
+    def __init__(self):
+        self.base = None
+        self.bits = 0
+
+    def add(self, day):
+        if self.base is None:
+            self.base = day
+            self.bits = 1
+        elif day < self.base:
+            self.bits = (self.bits << (self.base - day)) | 1
+            self.base = day
+        else:
+            self.bits |= 1 << (day - self.base)
+
+    def merge(self, other):
+        """Union with another TrendDays."""
+        if other.base is None:
+            return
+        if self.base is None:
+            self.base, self.bits = other.base, other.bits
+        elif other.base < self.base:
+            self.bits = (self.bits << (self.base - other.base)) | other.bits
+            self.base = other.base
+        else:
+            self.bits |= other.bits << (other.base - self.base)
+
+    def count(self):
+        """Number of distinct trending days."""
+        return self.bits.bit_count()
+
+    def first_day(self):
+        return self.base
+
+    def last_day(self):
+        return None if self.base is None else self.base + self.bits.bit_length() - 1
+
+    def days(self):
+        """Yield the trending days as ordinals, ascending."""
+        bits = self.bits
+        while bits:
+            low = bits & -bits
+            yield self.base + low.bit_length() - 1
+            bits ^= low
+
+    def longest_streak(self):
+        """Length of the longest run of consecutive trending days."""
+        bits = self.bits
+        streak = 0
+        while bits:
+            bits &= bits >> 1
+            streak += 1
+        return streak
+
+    def gaps(self):
+        """Lengths (in days) of every break between two trending days."""
+        found = []
+        previous = None
+        for day in self.days():
+            if previous is not None and day - previous > 1:
+                found.append(day - previous - 1)
+            previous = day
+        return found
+
+    def to_state(self):
+        return [self.base, format(self.bits, "x")]
+
+    @classmethod
+    def from_state(cls, state):
+        found = cls()
+        found.base = state[0]
+        found.bits = int(state[1], 16)
+        return found
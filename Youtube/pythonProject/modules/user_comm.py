@@ -77,6 +77,7 @@ def submenu_visuals():
     print("5. Interactive dashboard")
     print("6. Anomaly overlay chart")
     print("7. Tag word cloud")
+    print("8. Save every chart to a folder (PNG/SVG + HTML dashboard)")
     print("0. Back")
 
     return input("Pick an option: ").strip()
@@ -94,11 +95,21 @@ def submenu_export():
     print("5. Export recommendations")
     print("6. Export anomaly report")
     print("7. Export trending prediction results")
+    print("8. Export recommendations for all videos")
+    print("9. Export dataset (columnar binary)")
+    print("10. Export all analysis results (columnar binary)")
+    print("11. Export every report in one batch job")
     print("0. Back")
 
     return input("Pick an option: ").strip()
 
 
+def ask_dataset_path(default_path):
+    """Ask for a dataset file or glob pattern; blank keeps the default."""
+    v = input(f"Enter dataset path or glob [{default_path}]: ").strip()
+    return v or default_path
+
+
 def ask_video_id():
     """Ask the user for a video ID."""
     return input("Enter Video ID: ").strip()
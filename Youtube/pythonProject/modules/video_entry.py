@@ -1,33 +1,63 @@
 # modules/video_entry.py
 
+
+def _field(name):
+    """Build a read-only attribute that reads one column of the backing table."""
+    return property(lambda self: self._table.columns[name][self._row])
+
+
 class VideoEntry:
-    """Represents one YouTube trending video entry."""
-
-    def __init__(self, row):
-        # row is a dictionary from csv.DictReader
-        self.video_id = row.get("video_id", "")
-        self.trending_date = row.get("trending_date", "")
-        self.title = row.get("title", "")
-        self.channel_title = row.get("channel_title", "")
-        self.category_id = row.get("category_id", "")
-        self.publish_time = row.get("publish_time", "")
-        self.tags = row.get("tags", "")
-        self.views = self.to_int(row.get("views"))
-        self.likes = self.to_int(row.get("likes"))
-        self.dislikes = self.to_int(row.get("dislikes"))
-        self.comment_count = self.to_int(row.get("comment_count"))
-        self.thumbnail_link = row.get("thumbnail_link", "")
-        self.comments_disabled = row.get("comments_disabled", "")
-        self.ratings_disabled = row.get("ratings_disabled", "")
-        self.video_error_or_removed = row.get("video_error_or_removed", "")
-        self.description = row.get("description", "")
-
-    def to_int(self, value):
-        """Convert numeric text to integer safely."""
-        try:
-            return int(value)
-        except Exception:
-            return 0
+    """
+    Represents one YouTube trending video entry.
+    The values live in a VideoTable; an entry is only a (table, row) view.
+    """
+
+    __slots__ = ("_table", "_row")
+
+    def __init__(self, table, row):
+        self._table = table
+        self._row = row
+
+    @classmethod
+    def from_row(cls, row):
+        """Build a standalone entry from a csv.DictReader dictionary."""
+        from modules.video_table import VideoTable
+        table = VideoTable()
+        table.append(row)
+        return cls(table, 0)
+
+    video_id = _field("video_id")
+    trending_date = _field("trending_date")
+    title = _field("title")
+    channel_title = _field("channel_title")
+    category_id = _field("category_id")
+    publish_time = _field("publish_time")
+    tags = _field("tags")
+    views = _field("views")
+    likes = _field("likes")
+    dislikes = _field("dislikes")
+    comment_count = _field("comment_count")
+    thumbnail_link = _field("thumbnail_link")
+    comments_disabled = _field("comments_disabled")
+    ratings_disabled = _field("ratings_disabled")
+    video_error_or_removed = _field("video_error_or_removed")
+    description = _field("description")
+
+    @property
+    def row_index(self):
+        """Position of this entry inside its table."""
+        return self._row
+
+    def __eq__(self, other):
+        if not isinstance(other, VideoEntry):
+            return NotImplemented
+        return self._table is other._table and self._row == other._row
+
+    def __hash__(self):
+        return hash((id(self._table), self._row))
+
+    def __repr__(self):
+        return f"VideoEntry({self.video_id!r}, {self.trending_date!r})"
 
     def to_dict(self):
         """Convert object back to dictionary for export."""
@@ -0,0 +1,516 @@
+# modules/video_table.py
+# Columnar storage for the trending dataset: one compact column per field
+# instead of one Python object per CSV row.
+
+from array import array
+from itertools import chain, count
+from modules.video_entry import VideoEntry
+
+
+# CSV column order of the trending dataset
+FIELD_NAMES = (
+    "video_id", "trending_date", "title", "channel_title", "category_id",
+    "publish_time", "tags", "views", "likes", "dislikes", "comment_count",
+    "thumbnail_link", "comments_disabled", "ratings_disabled",
+    "video_error_or_removed", "description"
+)
+
+# integer counters, stored as signed 64-bit arrays
+NUMERIC_FIELDS = ("views", "likes", "dislikes", "comment_count")
+
+# short repeated strings, stored as small integer codes + value list
+ENCODED_FIELDS = (
+    "video_id", "category_id", "channel_title", "trending_date",
+    "comments_disabled", "ratings_disabled", "video_error_or_removed"
+)
+
+# raw tag strings, pooled and pre-split into interned tag ids
+TAGS_FIELD = "tags"
+
+# everything else is long text that repeats per video: stored once, packed
+POOLED_FIELDS = tuple(
+    f for f in FIELD_NAMES
+    if f not in NUMERIC_FIELDS and f not in ENCODED_FIELDS and f != TAGS_FIELD
+)
+
+# every VideoTable gets a distinct id (unlike id(), never reused)
+_TABLE_IDS = count(1)
+
+
+def to_int(value):
+    """Convert numeric text to integer safely."""
+    try:
+        return int(value)
+    except Exception:
+        return 0
+
+
+def to_int_array(values):
+    """
+    Convert a batch of numeric text to an int64 array. The whole batch goes
+    through int() in C; only a batch holding a bad value falls back to to_int.
+    """
+    try:
+        return array("q", map(int, values))
+    except (ValueError, TypeError):
+        return array("q", map(to_int, values))
+
+
+def _owned(buf):
+    """Copy a read-only memoryview (e.g. from a snapshot) into an owned buffer."""
+    if not isinstance(buf, memoryview):
+        return buf
+    if buf.format == "B":
+        return bytearray(buf)
+    owned = array(buf.format)
+    owned.frombytes(buf.cast("B"))
+    return owned
+
+
+def normalise_text(text):
+    """Case/whitespace-insensitive form used for title lookups."""
+    return text.lower().strip()
+
+
+def split_tags(raw_tags):
+    """Split a raw "a"|"b" tag string into a set of normalised tags."""
+    return set(t.strip().lower() for t in raw_tags.split("|"))
+
+
+# ------------------------------------
+# COLUMN TYPES
+# ------------------------------------
+
+class TextColumn:
+    """
+    Free-text column packed as UTF-8 bytes; a str is only built on access.
+    blob/offsets may also be read-only memoryviews (see modules/snapshot.py).
+    """
+
+    __slots__ = ("blob", "offsets")
+
+    def __init__(self):
+        self.blob = bytearray()
+        self.offsets = array("q", [0])
+
+    def __getstate__(self):
+        return {"blob": _owned(self.blob), "offsets": _owned(self.offsets)}
+
+    def __setstate__(self, state):
+        self.blob = state["blob"]
+        self.offsets = state["offsets"]
+
+    def append(self, text):
+        self.blob += text.encode("utf-8")
+        self.offsets.append(len(self.blob))
+
+    def extend(self, other):
+        """Append every row of another TextColumn."""
+        shift = len(self.blob)
+        self.blob += other.blob
+        self.offsets.extend(off + shift for off in other.offsets[1:])
+
+    def take(self, rows):
+        """New column holding only the given rows."""
+        out = TextColumn()
+        blob = self.blob
+        offs = self.offsets
+        if isinstance(rows, range) and rows.step == 1:
+            # contiguous rows: one slice of the buffer
+            start, end = offs[rows.start], offs[rows.stop]
+            out.blob = bytearray(blob[start:end])
+            out.offsets = array("q", [off - start for off in offs[rows.start:rows.stop + 1]])
+            return out
+
+        for row in rows:
+            out.blob += blob[offs[row]:offs[row + 1]]
+            out.offsets.append(len(out.blob))
+        return out
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index):
+        return str(self.blob[self.offsets[index]:self.offsets[index + 1]], "utf-8")
+
+    def __iter__(self):
+        blob = self.blob
+        offs = self.offsets
+        for i in range(len(offs) - 1):
+            yield str(blob[offs[i]:offs[i + 1]], "utf-8")
+
+
+class _CodedColumn:
+    """
+    Base for dictionary-encoded columns: each distinct value is stored once
+    in self.values and every row holds a small integer code into it.
+    Subclasses provide code_for(text): the code of a value, added to the
+    dictionary if new.
+    """
+
+    __slots__ = ("codes",)
+
+    def append(self, text):
+        self.codes.append(self.code_for(text))
+
+    def extend_values(self, values):
+        """Append a sequence of plain values; each distinct one is looked up once."""
+        memo = dict.fromkeys(values)
+        for text in memo:
+            memo[text] = self.code_for(text)
+        self.codes.extend(map(memo.__getitem__, values))
+
+    def extend(self, other):
+        """Append every row of another column of the same kind, re-mapping its codes."""
+        remap = [self.code_for(v) for v in other.values]
+        self.codes.extend(remap[c] for c in other.codes)
+
+    def take(self, rows):
+        """New column holding only the given rows, with a compact dictionary."""
+        out = type(self)()
+        values = self.values
+        remap = {}
+        for code in map(self.codes.__getitem__, rows):
+            new_code = remap.get(code)
+            if new_code is None:
+                new_code = remap[code] = out.code_for(values[code])
+            out.codes.append(new_code)
+        return out
+
+    def counts(self):
+        """Return a list: code -> number of rows holding that value."""
+        store = [0] * len(self.values)
+        for code in self.codes:
+            store[code] += 1
+        return store
+
+    def __len__(self):
+        return len(self.codes)
+
+    def __getitem__(self, index):
+        return self.values[self.codes[index]]
+
+    def __iter__(self):
+        return map(self.values.__getitem__, self.codes)
+
+
+class EncodedColumn(_CodedColumn):
+    """Dictionary-encoded string column for short, repeated values (ids, channels...)."""
+
+    __slots__ = ("values", "_lookup")
+
+    def __init__(self):
+        self.codes = array("i")
+        self.values = []
+        self._lookup = {}
+
+    def __getstate__(self):
+        return {"codes": _owned(self.codes), "values": self.values}
+
+    def __setstate__(self, state):
+        self.codes = state["codes"]
+        self.values = state["values"]
+        self._lookup = {v: code for code, v in enumerate(self.values)}
+
+    def code_for(self, text):
+        code = self._lookup.get(text)
+        if code is None:
+            code = len(self.values)
+            self._lookup[text] = code
+            self.values.append(text)
+        return code
+
+    def code_of(self, text):
+        """Return the code of a value, or None if it never occurs."""
+        return self._lookup.get(text)
+
+
+class PooledTextColumn(_CodedColumn):
+    """
+    Dictionary-encoded long text (descriptions, titles, links): every
+    distinct value is packed once into a TextColumn, so a description
+    repeated on each trending day of a video costs one copy. The lookup
+    keeps only str hashes, not the strings themselves.
+    """
+
+    __slots__ = ("values", "_lookup", "_collided")
+
+    def __init__(self):
+        self.codes = array("i")
+        self.values = TextColumn()
+        self._lookup = {}
+        # values whose hash clashed with a different earlier value
+        self._collided = {}
+
+    def __getstate__(self):
+        return {"codes": _owned(self.codes), "values": self.values}
+
+    def __setstate__(self, state):
+        self.codes = state["codes"]
+        self.values = state["values"]
+        self.rebuild_lookup()
+
+    def rebuild_lookup(self):
+        """Re-create the hash lookup (str hashes differ between processes)."""
+        self._lookup = {}
+        self._collided = {}
+        for code, text in enumerate(self.values):
+            self._remember(text, code)
+
+    def _remember(self, text, code):
+        if self._lookup.setdefault(hash(text), code) != code:
+            self._collided[text] = code
+
+    def code_for(self, text):
+        code = self._lookup.get(hash(text))
+        if code is not None and self.values[code] == text:
+            return code
+
+        code = self._collided.get(text)
+        if code is None:
+            code = len(self.values)
+            self.values.append(text)
+            self._remember(text, code)
+        return code
+
+
+class TagsColumn(PooledTextColumn):
+    """
+    The raw "a"|"b" tag strings, pooled like other text, plus each distinct
+    string pre-split once into a tuple of interned tag ids (normalised with
+    strip/lower, original order and duplicates kept).
+    """
+
+    __slots__ = ("tag_names", "_tag_lookup", "tag_ids")
+
+    def __init__(self):
+        self.tag_names = []
+        self._tag_lookup = {}
+        # code of a distinct raw string -> tuple of tag ids
+        self.tag_ids = []
+        PooledTextColumn.__init__(self)
+
+    def rebuild_lookup(self):
+        """Re-create the hash lookup and re-split every distinct tag string."""
+        self.tag_names = []
+        self._tag_lookup = {}
+        self.tag_ids = [self._split(text) for text in self.values]
+        PooledTextColumn.rebuild_lookup(self)
+
+    def _split(self, text):
+        ids = []
+        for t in text.split("|"):
+            tag = t.strip().lower()
+            tag_id = self._tag_lookup.get(tag)
+            if tag_id is None:
+                tag_id = self._tag_lookup[tag] = len(self.tag_names)
+                self.tag_names.append(tag)
+            ids.append(tag_id)
+        return tuple(ids)
+
+    def code_for(self, text):
+        code = PooledTextColumn.code_for(self, text)
+        if code == len(self.tag_ids):
+            self.tag_ids.append(self._split(text))
+        return code
+
+    def tag_set(self, row):
+        """Distinct normalised tags of one row (what split_tags would return)."""
+        names = self.tag_names
+        return {names[i] for i in self.tag_ids[self.codes[row]]}
+
+
+# ------------------------------------
+# TABLE
+# ------------------------------------
+
+class VideoTable:
+    """
+    Column store holding every loaded trending row.
+    Iterating or indexing yields VideoEntry row views, so code written
+    against a list of VideoEntry objects keeps working.
+    """
+
+    def __init__(self):
+        self._indexes = {}
+        # (table_id, version) names the current contents (see result_cache)
+        self.table_id = next(_TABLE_IDS)
+        self.version = 0
+        self.columns = {}
+        for name in FIELD_NAMES:
+            if name in NUMERIC_FIELDS:
+                self.columns[name] = array("q")
+            elif name in ENCODED_FIELDS:
+                self.columns[name] = EncodedColumn()
+            elif name == TAGS_FIELD:
+                self.columns[name] = TagsColumn()
+            else:
+                self.columns[name] = PooledTextColumn()
+
+    def append(self, row):
+        """Append one csv.DictReader row."""
+        self._changed()
+        for name, col in self.columns.items():
+            value = row.get(name)
+            if name in NUMERIC_FIELDS:
+                col.append(to_int(value))
+            else:
+                col.append(value if value is not None else "")
+
+    def extend_records(self, records, header):
+        """
+        Append csv.reader rows (lists of strings laid out as header) without
+        building a dict per row. Rows are handled like csv.DictReader does:
+        blank lines are skipped and missing trailing fields become "".
+        Each column is filled in one pass, numerics converted in bulk.
+        """
+        self._changed()
+        # the last occurrence of a repeated header name wins, as in a dict
+        position = {name: pos for pos, name in enumerate(header)}
+        width = len(header)
+        rows = [r if len(r) >= width else r + [""] * (width - len(r))
+                for r in records if r]
+        # transpose in C: one tuple per CSV column
+        fields = list(zip(*rows)) if rows else [()] * width
+
+        for name, col in self.columns.items():
+            pos = position.get(name)
+            values = fields[pos] if pos is not None else ("",) * len(rows)
+
+            if name in NUMERIC_FIELDS:
+                col.extend(to_int_array(values))
+            else:
+                col.extend_values(values)
+
+    def _changed(self):
+        """Rows were added: drop the indexes and move to a new version."""
+        if self._indexes:
+            self._indexes.clear()
+        self.version += 1
+
+    def __getstate__(self):
+        """
+        Every column pickles owned copies of its buffers, since memory-mapped
+        snapshot views cannot be pickled. Indexes are left out and rebuilt
+        on demand.
+        """
+        columns = {}
+        for name, col in self.columns.items():
+            columns[name] = _owned(col) if name in NUMERIC_FIELDS else col
+        return {"columns": columns}
+
+    def __setstate__(self, state):
+        self._indexes = {}
+        self.table_id = next(_TABLE_IDS)
+        self.version = 0
+        self.columns = state["columns"]
+
+    def extend(self, other):
+        """Append all rows of another VideoTable, keeping their order."""
+        self._changed()
+        for name, col in self.columns.items():
+            col.extend(other.columns[name])
+
+    def index(self, name, normalise=None):
+        """
+        Return a dict: column value -> list of row numbers, in row order.
+        Built once on first use and dropped whenever rows are added.
+        normalise, if given, is applied to every value before hashing.
+        """
+        key = (name, normalise)
+        found = self._indexes.get(key)
+        if found is not None:
+            return found
+
+        col = self.columns[name]
+        if normalise is None and isinstance(col, _CodedColumn):
+            found = dict(zip(col.values, self.code_buckets(name)))
+        else:
+            found = {}
+            values = col if normalise is None else map(normalise, col)
+            for row, value in enumerate(values):
+                found.setdefault(value, []).append(row)
+
+        self._indexes[key] = found
+        return found
+
+    def tag_index(self):
+        """
+        Inverted index: normalised tag -> list of rows carrying it.
+        A row is listed once per distinct tag, in row order.
+        """
+        found = self._indexes.get("tags")
+        if found is not None:
+            return found
+
+        col = self.columns[TAGS_FIELD]
+        names = col.tag_names
+        postings = [[] for _ in names]
+        # each distinct tag string adds its rows to the postings of its tags
+        for code, rows in enumerate(self.code_buckets(TAGS_FIELD)):
+            if rows:
+                for tag_id in set(col.tag_ids[code]):
+                    postings[tag_id].append(rows)
+
+        found = {}
+        for tag_id, row_lists in enumerate(postings):
+            if row_lists:
+                rows = list(chain.from_iterable(row_lists))
+                if len(row_lists) > 1:
+                    rows.sort()
+                found[names[tag_id]] = rows
+
+        self._indexes["tags"] = found
+        return found
+
+    def code_buckets(self, name):
+        """For a dictionary-encoded column: list of code -> rows holding it."""
+        key = (name, "codes")
+        found = self._indexes.get(key)
+        if found is None:
+            col = self.columns[name]
+            found = [[] for _ in range(len(col.values))]
+            for row, code in enumerate(col.codes):
+                found[code].append(row)
+            self._indexes[key] = found
+        return found
+
+    def lookup(self, name, value, normalise=None):
+        """Return every entry whose column value equals value."""
+        if normalise is not None:
+            value = normalise(value)
+        return [VideoEntry(self, row) for row in self.index(name, normalise).get(value, [])]
+
+    def take(self, rows):
+        """Return a new VideoTable with only the given rows (a range or list), in that order."""
+        out = VideoTable()
+        for name, col in self.columns.items():
+            if name in NUMERIC_FIELDS:
+                out.columns[name] = array("q", map(col.__getitem__, rows))
+            else:
+                out.columns[name] = col.take(rows)
+        return out
+
+    def column(self, name):
+        """Return the raw storage of one column."""
+        return self.columns[name]
+
+    def cell(self, name, row):
+        """Return the value of one field for one row."""
+        return self.columns[name][row]
+
+    def __len__(self):
+        return len(self.columns["views"])
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield VideoEntry(self, i)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [VideoEntry(self, i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("row index out of range")
+        return VideoEntry(self, index)
@@ -1,28 +1,88 @@
 # modules/visualisation.py
+# Plotting libraries are imported by the chart functions that use them, on
+# first call, so importing this module (and starting the menu) stays cheap.
+# Every chart shows a window by default; given save_path it is written to
+# that file instead (see render_charts for headless batch rendering).
 
-import matplotlib.pyplot as plt
-import seaborn as sns
+import os
+import time
 from collections import defaultdict
-from wordcloud import WordCloud
-import plotly.express as px
-import plotly.graph_objects as go
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from modules.binning import thin_points
+from modules.data_processing import (
+    list_categories, top_ten_items, trending_duration, engagement_histograms,
+    catch_anomalies, top_keywords
+)
+from modules.exporter import _ensure_folder
+from modules.workers import init_worker_table, worker_table
+
+# points drawn by a scatter chart, whatever the size of the table
+SCATTER_POINTS = 5000
+
+# tags drawn by the word cloud (the most frequent ones)
+CLOUD_TAGS = 200
+
+
+# ------------------------------------
+# LAZY BACKENDS
+# ------------------------------------
+
+def use_headless():
+    """Switch matplotlib to the non-interactive Agg backend (no GUI needed)."""
+    import matplotlib
+    matplotlib.use("Agg")
+
+
+def _pyplot():
+    import matplotlib.pyplot as plt
+    return plt
+
+
+def _plotly_express():
+    import plotly.express as px
+    return px
+
+
+def _wordcloud():
+    from wordcloud import WordCloud
+    return WordCloud
+
+
+def _finish(plt, save_path):
+    """
+    Show the current figure, or with save_path write it to that file
+    (PNG, SVG, PDF... picked from the extension) and close it.
+    """
+    if save_path is None:
+        plt.show()
+        return
+
+    _ensure_folder(os.path.dirname(save_path))
+    plt.savefig(save_path)
+    plt.close()
+
+
+def _anomaly_rows(data_obj):
+    """Row numbers of the catch_anomalies rows (high likes, very few comments)."""
+    return [entry.row_index for entry in catch_anomalies(data_obj)]
 
 
 # ------------------------------------
 # BASIC VISUALISATIONS
 # ------------------------------------
 
-def pie_categories(data_obj):
+def pie_categories(data_obj, save_path=None):
     """
     Pie chart showing distribution of videos per category.
     """
+    plt = _pyplot()
+
     if not data_obj:
         print("No data loaded.")
         return
 
-    cat_count = defaultdict(int)
-    for entry in data_obj:
-        cat_count[entry.category_id] += 1
+    cat_count = list_categories(data_obj)
 
     labels = list(cat_count.keys())
     sizes = list(cat_count.values())
@@ -30,58 +90,56 @@ def pie_categories(data_obj):
     plt.figure(figsize=(8, 8))
     plt.pie(sizes, labels=labels, autopct="%1.1f%%")
     plt.title("Video Distribution by Category")
-    plt.show()
+    _finish(plt, save_path)
 
 
-def hist_engagement(data_obj):
+def hist_engagement(data_obj, save_path=None):
     """
-    Histograms for views, likes, and comments.
+    Histograms for views, likes, and comments, on log-scale bins.
+    Bins are counted by the histograms aggregate; only the counts are drawn.
     """
-    view_list = []
-    like_list = []
-    comment_list = []
+    plt = _pyplot()
 
-    for entry in data_obj:
-        view_list.append(entry.views)
-        like_list.append(entry.likes)
-        comment_list.append(entry.comment_count)
+    hists = engagement_histograms(data_obj)
+    panels = [
+        ("views", "Views Distribution", "blue"),
+        ("likes", "Likes Distribution", "green"),
+        ("comment_count", "Comment Count Distribution", "red"),
+    ]
 
     fig, axs = plt.subplots(3, 1, figsize=(9, 14))
 
-    sns.histplot(view_list, bins=30, ax=axs[0], color="blue")
-    axs[0].set_title("Views Distribution")
-
-    sns.histplot(like_list, bins=30, ax=axs[1], color="green")
-    axs[1].set_title("Likes Distribution")
-
-    sns.histplot(comment_list, bins=30, ax=axs[2], color="red")
-    axs[2].set_title("Comment Count Distribution")
+    for ax, (field, title, color) in zip(axs, panels):
+        hist = hists[field]
+        if hist["counts"]:
+            ax.stairs(hist["counts"], hist["edges"], fill=True, color=color, alpha=0.6)
+        # linear below 1 so the zero bin stays visible
+        ax.set_xscale("symlog", linthresh=1)
+        ax.set_title(title)
+        ax.set_ylabel("Count")
 
     plt.tight_layout()
-    plt.show()
+    _finish(plt, save_path)
 
 
 # ------------------------------------
 # INTERMEDIATE VISUALISATIONS
 # ------------------------------------
 
-def cat_trend_lines(data_obj):
+def cat_trend_lines(data_obj, save_path=None):
     """
     Line chart showing average trending duration per category.
     """
+    plt = _pyplot()
+
     dur_store = defaultdict(list)
 
-    # collect trending dates per video first
-    vid_dates = defaultdict(set)
-    for entry in data_obj:
-        if entry.trending_date:
-            vid_dates[entry.video_id].add(entry.trending_date)
+    # trending days per video, from the shared day-bitset aggregate
+    durations = trending_duration(data_obj)
 
     # now map each video duration to its category
-    for entry in data_obj:
-        vid = entry.video_id
-        days = len(vid_dates[vid])
-        dur_store[entry.category_id].append(days)
+    for cat, vid in zip(data_obj.column("category_id"), data_obj.column("video_id")):
+        dur_store[cat].append(durations.get(vid, 0))
 
     avg_list = []
     cat_list = []
@@ -98,21 +156,17 @@ def cat_trend_lines(data_obj):
     plt.xlabel("Category ID")
     plt.ylabel("Average Duration (Days)")
     plt.grid(True)
-    plt.show()
+    _finish(plt, save_path)
 
 
-def compare_top_bars(data_obj):
+def compare_top_bars(data_obj, save_path=None):
     """
     Bar chart comparing likes/dislikes/comments for top performing videos.
     Top videos are selected based on engagement score.
     """
-    scored = []
-    for entry in data_obj:
-        score_val = entry.views + entry.likes + entry.comment_count
-        scored.append((score_val, entry))
+    plt = _pyplot()
 
-    scored.sort(key=lambda x: x[0], reverse=True)
-    picked = [x[1] for x in scored[:10]]
+    picked = top_ten_items(data_obj)
 
     names = [p.title[:20] + "..." for p in picked]
     likes = [p.likes for p in picked]
@@ -130,91 +184,215 @@ def compare_top_bars(data_obj):
     plt.title("Engagement Metrics for Top 10 Videos")
     plt.legend()
     plt.tight_layout()
-    plt.show()
+    _finish(plt, save_path)
 
 
 # ------------------------------------
 # ADVANCED VISUALISATIONS
 # ------------------------------------
 
-def dashboard_view(data_obj):
+def dashboard_view(data_obj, save_path=None):
     """
     Interactive dashboard using Plotly:
     Allows filtering by category and shows engagement metrics.
+    Large tables are thinned to about SCATTER_POINTS points (anomalies are
+    always kept), so the page stays the same size as the data grows.
     """
-    entries = {
-        "title": [],
-        "category_id": [],
-        "views": [],
-        "likes": [],
-        "comments": []
-    }
+    px = _plotly_express()
 
-    for entry in data_obj:
-        entries["title"].append(entry.title)
-        entries["category_id"].append(entry.category_id)
-        entries["views"].append(entry.views)
-        entries["likes"].append(entry.likes)
-        entries["comments"].append(entry.comment_count)
+    views = data_obj.column("views")
+    likes = data_obj.column("likes")
+    rows = thin_points(views, likes, _anomaly_rows(data_obj), SCATTER_POINTS)
+
+    title = "Interactive Engagement Dashboard"
+    if len(rows) < len(data_obj):
+        title += f" ({len(rows)} of {len(data_obj)} videos shown)"
+
+    sample = data_obj.take(rows)
 
     fig = px.scatter(
-        x=entries["views"],
-        y=entries["likes"],
-        color=entries["category_id"],
-        hover_name=entries["title"],
-        title="Interactive Engagement Dashboard"
+        x=list(sample.column("views")),
+        y=list(sample.column("likes")),
+        color=list(sample.column("category_id")),
+        hover_name=list(sample.column("title")),
+        title=title
     )
 
     fig.update_layout(xaxis_title="Views", yaxis_title="Likes")
-    fig.show()
+    if save_path is None:
+        fig.show()
+    else:
+        # standalone page: plotly.js is embedded, no network needed to view it
+        _ensure_folder(os.path.dirname(save_path))
+        fig.write_html(save_path, include_plotlyjs=True)
 
 
-def mark_anomalies(data_obj):
+def mark_anomalies(data_obj, save_path=None):
     """
     Overlay scatter plot showing anomalies with high likes and low comments.
+    Normal rows are thinned to about SCATTER_POINTS points; every anomaly is drawn.
     """
-    x_norm = []
-    y_norm = []
-    x_flag = []
-    y_flag = []
+    plt = _pyplot()
+
+    likes = data_obj.column("likes")
+    comments = data_obj.column("comment_count")
+    flagged = _anomaly_rows(data_obj)
+    shown = thin_points(likes, comments, flagged, SCATTER_POINTS + len(flagged))
+
+    flag_set = set(flagged)
+    normal = [row for row in shown if row not in flag_set]
 
-    for entry in data_obj:
-        if entry.likes > 50000 and entry.comment_count < 50:
-            x_flag.append(entry.likes)
-            y_flag.append(entry.comment_count)
-        else:
-            x_norm.append(entry.likes)
-            y_norm.append(entry.comment_count)
+    label = "Normal"
+    if len(shown) < len(data_obj):
+        label += f" (sample of {len(normal)} of {len(data_obj) - len(flagged)})"
 
     plt.figure(figsize=(9, 6))
-    plt.scatter(x_norm, y_norm, alpha=0.4, label="Normal")
-    plt.scatter(x_flag, y_flag, color='red', label="Anomalies", s=80)
+    plt.scatter([likes[r] for r in normal], [comments[r] for r in normal], alpha=0.4, label=label)
+    plt.scatter([likes[r] for r in flagged], [comments[r] for r in flagged],
+                color='red', label="Anomalies", s=80)
     plt.title("Anomaly Detection Overlay")
     plt.xlabel("Likes")
     plt.ylabel("Comment Count")
     plt.legend()
-    plt.show()
+    _finish(plt, save_path)
 
 
-def tag_wordcloud(data_obj):
+@lru_cache(maxsize=8)
+def _cloud_image(frequencies, width=900, height=500):
+    """
+    Render a word cloud from a tuple of (tag, count) pairs. Tags are laid
+    out as given (multi-word tags stay whole), and images are cached on
+    the frequency snapshot: the same top tags are only rendered once.
+    """
+    WordCloud = _wordcloud()
+    wc = WordCloud(width=width, height=height, background_color="white",
+                   max_words=len(frequencies))
+    image = wc.generate_from_frequencies(dict(frequencies)).to_array()
+    image.flags.writeable = False  # shared by every later hit
+    return image
+
+
+def tag_wordcloud(data_obj, save_path=None):
     """
     Generate a word cloud from tag frequencies.
+    Drawn from the CLOUD_TAGS most frequent entries of tag_keywords, so
+    the cost depends on the number of distinct tags, not on occurrences.
     """
-    all_tags = []
+    plt = _pyplot()
 
-    for entry in data_obj:
-        parts = entry.tags.split("|")
-        for t in parts:
-            t = t.strip().lower()
-            if t not in ("", "nan", "[none]"):
-                all_tags.append(t)
+    top = top_keywords(data_obj, CLOUD_TAGS)
+    if not top:
+        print("No tags to draw.")
+        return
 
-    text_blob = " ".join(all_tags)
+    # tags keep the quotes of the CSV; drop them for the labels
+    labels = {}
+    for tag, count in top:
+        label = tag.strip('"')
+        labels[label] = labels.get(label, 0) + count
 
-    wc = WordCloud(width=900, height=500, background_color="white").generate(text_blob)
+    image = _cloud_image(tuple(labels.items()))
 
     plt.figure(figsize=(12, 6))
-    plt.imshow(wc, interpolation="bilinear")
+    plt.imshow(image, interpolation="bilinear")
     plt.axis("off")
     plt.title("Tag Frequency Word Cloud")
-    plt.show()
+    _finish(plt, save_path)
+
+
+# ------------------------------------
+# HEADLESS CHART PACK
+# ------------------------------------
+
+# chart name -> function; every chart takes (data_obj, save_path)
+CHARTS = {
+    "pie_categories": pie_categories,
+    "hist_engagement": hist_engagement,
+    "cat_trend_lines": cat_trend_lines,
+    "compare_top_bars": compare_top_bars,
+    "dashboard_view": dashboard_view,
+    "mark_anomalies": mark_anomalies,
+    "tag_wordcloud": tag_wordcloud,
+}
+
+def _init_chart_worker(table):
+    """Pool initializer: keep the table and switch this worker to Agg."""
+    init_worker_table(table)
+    try:
+        use_headless()
+    except ImportError:
+        pass  # reported per chart by _render
+
+
+def _render(table, job):
+    """Render one (chart name, save path) job; returns its timing record."""
+    name, save_path = job
+    started = time.perf_counter()
+    try:
+        CHARTS[name](table, save_path)
+        error = None
+    except Exception as err:
+        error = f"{type(err).__name__}: {err}"
+
+    return {
+        "chart": name,
+        "path": save_path,
+        "seconds": round(time.perf_counter() - started, 4),
+        "ok": error is None,
+        "error": error
+    }
+
+
+def _render_in_worker(job):
+    return _render(worker_table(), job)
+
+
+def render_charts(data_obj, jobs, workers=None):
+    """
+    Render [(chart name, save path)] headless, straight to files. With
+    workers > 1 the charts are drawn in parallel worker processes, each
+    holding one copy of the table. Returns a timing record per job, in
+    job order; a failing chart is recorded, not raised.
+    """
+    for name, _ in jobs:
+        if name not in CHARTS:
+            raise ValueError(f"Unknown chart: {name}")
+
+    workers = min(workers or 1, len(jobs))
+    if workers <= 1:
+        # draw in this process on Agg, then give back the backend the
+        # interactive charts were using
+        try:
+            import matplotlib
+        except ImportError:
+            # every chart records the ImportError itself
+            return [_render(data_obj, job) for job in jobs]
+
+        previous = matplotlib.get_backend()
+        use_headless()
+        try:
+            return [_render(data_obj, job) for job in jobs]
+        finally:
+            if previous.lower() != "agg":
+                _pyplot().switch_backend(previous)
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_chart_worker,
+                             initargs=(data_obj,)) as pool:
+        return list(pool.map(_render_in_worker, jobs))
+
+
+def chart_pack_jobs(out_dir, image_format="png"):
+    """
+    (chart name, save path) for every chart in out_dir: images as
+    image_format (png or svg), the interactive dashboard as standalone HTML.
+    """
+    jobs = []
+    for name in CHARTS:
+        ext = "html" if name == "dashboard_view" else image_format
+        jobs.append((name, os.path.join(out_dir, f"{name}.{ext}")))
+    return jobs
+
+
+def render_chart_pack(data_obj, out_dir, image_format="png", workers=None):
+    """Render every chart into out_dir (see chart_pack_jobs); returns timing records."""
+    return render_charts(data_obj, chart_pack_jobs(out_dir, image_format), workers)
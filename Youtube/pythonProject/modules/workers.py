@@ -0,0 +1,18 @@
+# modules/workers.py
+# The table shared by every task of a process pool. It is handed to each
+# worker once by the pool initializer (forked workers inherit it without a
+# copy) and jobs then only carry row numbers, never table data.
+
+# table of this worker process (set by init_worker_table)
+_WORKER_TABLE = None
+
+
+def init_worker_table(table):
+    """Pool initializer: keep table for every task of this worker process."""
+    global _WORKER_TABLE
+    _WORKER_TABLE = table
+
+
+def worker_table():
+    """The table handed to this worker process by init_worker_table."""
+    return _WORKER_TABLE
@@ -0,0 +1,113 @@
+# startup_benchmark.py
+# Import-time budget of the menu start. Runs `python -X importtime -c
+# "import main"` in fresh interpreters, parses the report and fails when the
+# import of main takes longer than the budget or pulls in a plotting library.
+#
+#   python startup_benchmark.py [--budget-ms 250] [--runs 5] [--json]
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+# default budget for importing main.py, in milliseconds
+BUDGET_MS = 250
+
+# libraries that must only be imported when a chart is drawn
+HEAVY_MODULES = ("matplotlib", "plotly", "wordcloud", "numpy", "pandas")
+
+
+def parse_importtime(report, target):
+    """
+    Parse -X importtime output. Returns (cumulative microseconds of target,
+    {module: self microseconds} of every module imported).
+    """
+    total = None
+    modules = {}
+    for line in report.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        self_us, cumulative, name = line[len("import time:"):].split("|")
+        if not self_us.strip().isdigit():
+            continue  # header line
+        modules[name.strip()] = int(self_us)
+        if name.rstrip() == " " + target:
+            total = int(cumulative)
+    return total, modules
+
+
+def measure(target="main", runs=5):
+    """
+    Import target in `runs` fresh interpreters. Returns the best run as
+    {"import_ms", "wall_ms", "modules"}.
+    """
+    here = os.path.dirname(os.path.abspath(__file__))
+    best = None
+    for _ in range(runs):
+        started = time.perf_counter()
+        done = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {target}"],
+            cwd=here, capture_output=True, text=True
+        )
+        wall = time.perf_counter() - started
+        if done.returncode != 0:
+            raise RuntimeError(f"import {target} failed:\n{done.stderr}")
+
+        total, modules = parse_importtime(done.stderr, target)
+        run = {"import_ms": total / 1000, "wall_ms": wall * 1000, "modules": modules}
+        if best is None or run["import_ms"] < best["import_ms"]:
+            best = run
+    return best
+
+
+def check(result, budget_ms=BUDGET_MS):
+    """Return a list of budget violations (empty when the start is within budget)."""
+    problems = []
+    if result["import_ms"] > budget_ms:
+        problems.append(f"import took {result['import_ms']:.1f} ms, budget is {budget_ms} ms")
+
+    heavy = sorted(m for m in result["modules"] if m.split(".")[0] in HEAVY_MODULES)
+    if heavy:
+        problems.append("heavy modules imported at startup: " + ", ".join(heavy[:10]))
+    return problems
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check the import-time budget of main.py.")
+    parser.add_argument("--budget-ms", type=float, default=BUDGET_MS)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--target", default="main")
+    parser.add_argument("--json", action="store_true", help="print the result as JSON")
+    args = parser.parse_args(argv)
+
+    result = measure(args.target, args.runs)
+    problems = check(result, args.budget_ms)
+    slowest = sorted(result["modules"].items(), key=lambda kv: kv[1], reverse=True)[:10]
+
+    if args.json:
+        print(json.dumps({
+            "target": args.target,
+            "import_ms": round(result["import_ms"], 2),
+            "wall_ms": round(result["wall_ms"], 2),
+            "budget_ms": args.budget_ms,
+            "modules": len(result["modules"]),
+            "slowest": [{"module": m, "self_ms": us / 1000} for m, us in slowest],
+            "ok": not problems,
+            "problems": problems
+        }))
+    else:
+        print(f"import {args.target}: {result['import_ms']:.1f} ms "
+              f"(process {result['wall_ms']:.1f} ms, {len(result['modules'])} modules, "
+              f"budget {args.budget_ms:.0f} ms)")
+        for name, us in slowest:
+            print(f"  {us / 1000:8.2f} ms  {name}")
+        for problem in problems:
+            print("FAIL:", problem)
+
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())